@@ -0,0 +1,292 @@
+import math
+import random
+from typing import Iterator, Optional
+import config
+import game
+
+Cell = tuple[int, int]
+
+# Indexed by SnakeOrientation.value, like the tables in game.Snake.
+DIRECTIONS = [(0, -1), (-1, 0), (1, 0), (0, 1)]
+TURNS = [
+    [game.SnakeOrientation.LEFT, game.SnakeOrientation.RIGHT],
+    [game.SnakeOrientation.UP, game.SnakeOrientation.DOWN],
+    [game.SnakeOrientation.UP, game.SnakeOrientation.DOWN],
+    [game.SnakeOrientation.LEFT, game.SnakeOrientation.RIGHT],
+]
+BOT_LOOKAHEAD = 2.0
+BOT_RETARGET_TIME = 2.0
+BOT_TARGET_CHOICES = 4
+SPAWN_MARGIN = 5
+SPAWN_CLEARANCE = 3
+SPAWN_ATTEMPTS = 16
+
+
+class Arena:
+    """Many snakes and foods on one board. With ``player`` set, snake 0 is
+    steered with set_snake_orientation and the game ends when it dies; all
+    other snakes are bots that respawn.
+
+    Every collision goes through a broad phase before Snake.is_close_to_body.
+    The SegmentGrid of each snake records it in the shared ``owners`` index
+    for the cells its segments reach. The segments at the heads are not in
+    those grids, so they are put into a coarse grid after every move. Foods
+    are indexed by cell and looked up only around the heads, because a body
+    only ever covers cells its head has crossed.
+    """
+
+    def __init__(
+        self,
+        width: int = config.ARENA_WIDTH,
+        height: int = config.ARENA_HEIGHT,
+        snakes: int = config.ARENA_BOTS + 1,
+        seed: Optional[int] = None,
+        player: bool = True,
+        foods_per_snake: int = config.ARENA_FOODS_PER_SNAKE,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.random = random.Random(seed)
+        self.food_spawner = game.FoodSpawner(0, width - 1, 0, height - 1, self.random)
+        self.player = player
+        self.playing = not player
+        self.end = 0
+        self.owners: dict[Cell, set[int]] = {}
+        self.heads: dict[Cell, list[int]] = {}
+        self.food_cells: dict[Cell, list[game.Food]] = {}
+        self.food_count = 0
+        self.food_target = foods_per_snake * snakes
+        self.snakes = [game.Snake() for _ in range(snakes)]
+        self.alive = [False] * snakes
+        self.targets: list[Optional[game.Food]] = [None] * snakes
+        self.retarget_times = [0.0] * snakes
+        for i in range(snakes):
+            if self.spawn(i):
+                self.add_head(i)
+        self.spawn_foods()
+
+    def get_score(self) -> int:
+        return self.snakes[0].length - config.SNAKE_INITIAL_LENGTH
+
+    def get_foods(self) -> Iterator[game.Food]:
+        for foods in self.food_cells.values():
+            yield from foods
+
+    def set_snake_orientation(self, orientation: game.SnakeOrientation) -> None:
+        if self.end == 0:
+            self.playing = True
+            self.snakes[0].set_orientation(orientation)
+
+    def is_bot(self, i: int) -> bool:
+        return i > 0 or not self.player
+
+    def is_inside(self, point: game.GamePoint) -> bool:
+        return 0 < point.x < self.width - 1 and 0 < point.y < self.height - 1
+
+    def get_head_cell(self, x: float, y: float) -> Cell:
+        size = config.ARENA_HEAD_CELL_SIZE
+        return math.floor(x / size), math.floor(y / size)
+
+    def add_head(self, i: int) -> None:
+        """Index the segment from the head to the next key point, with the one
+        unit around it, by the coarse cells it reaches."""
+        key_points = self.snakes[i].key_points
+        k1 = key_points[0]
+        k2 = key_points[1] if len(key_points) >= 2 else k1
+        x0, y0 = self.get_head_cell(min(k1.x, k2.x) - 1, min(k1.y, k2.y) - 1)
+        x1, y1 = self.get_head_cell(max(k1.x, k2.x) + 1, max(k1.y, k2.y) + 1)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                self.heads.setdefault((x, y), []).append(i)
+
+    def update_heads(self) -> None:
+        self.heads = {}
+        for i, alive in enumerate(self.alive):
+            if alive:
+                self.add_head(i)
+
+    def get_candidates(self, point: game.GamePoint) -> set[int]:
+        """Snakes that may be within one unit of the point."""
+        candidates = set(
+            self.owners.get((math.floor(point.x), math.floor(point.y)), ())
+        )
+        candidates.update(self.heads.get(self.get_head_cell(point.x, point.y), ()))
+        return candidates
+
+    def is_blocked(self, i: int, point: game.GamePoint) -> bool:
+        """Whether snake ``i`` would die with its head at the point."""
+        if not self.is_inside(point):
+            return True
+        for j in self.get_candidates(point):
+            snake = self.snakes[j]
+            if snake.is_close_to_body(point):
+                return True
+            if j != i and snake.key_points[0].distance(point) < 1:
+                return True
+        return False
+
+    def is_clear(self, x: float, y: float) -> bool:
+        cx, cy = math.floor(x), math.floor(y)
+        r = SPAWN_CLEARANCE
+        for i in range(cx - r, cx + r + 1):
+            for j in range(cy - r, cy + r + 1):
+                if (i, j) in self.owners:
+                    return False
+        return self.get_head_cell(x, y) not in self.heads
+
+    def spawn(self, i: int) -> bool:
+        for _ in range(SPAWN_ATTEMPTS):
+            x = self.random.uniform(SPAWN_MARGIN, self.width - 1 - SPAWN_MARGIN)
+            y = self.random.uniform(SPAWN_MARGIN, self.height - 1 - SPAWN_MARGIN)
+            if self.is_clear(x, y):
+                break
+        else:
+            return False
+        snake = self.snakes[i]
+        snake.reset(x, y)
+        snake.key_points[0].orientation = self.random.choice(
+            list(game.SnakeOrientation)
+        )
+        snake.segment_grid = game.SegmentGrid(i, self.owners)
+        self.alive[i] = True
+        self.targets[i] = None
+        return True
+
+    def kill(self, i: int, reason: int) -> None:
+        self.alive[i] = False
+        if self.is_bot(i):
+            self.snakes[i].segment_grid.clear()
+        else:
+            # The game is over; the body stays to be drawn under the end menu.
+            self.end = reason
+
+    def is_food_free(self, food: game.Food) -> bool:
+        cx, cy = math.floor(food.x), math.floor(food.y)
+        for i in range(cx - 1, cx + 2):
+            for j in range(cy - 1, cy + 2):
+                for other in self.food_cells.get((i, j), ()):
+                    if food.is_close_to(other):
+                        return False
+        return not self.is_blocked(-1, food)
+
+    def spawn_foods(self) -> None:
+        for _ in range(self.food_target - self.food_count):
+            for _ in range(config.FOOD_SPAWN_ATTEMPTS):
+                food = game.Food(
+                    self.random.uniform(0, self.width - 1),
+                    self.random.uniform(0, self.height - 1),
+                    self.food_spawner.random_type(),
+                )
+                if self.is_food_free(food):
+                    cell = (math.floor(food.x), math.floor(food.y))
+                    self.food_cells.setdefault(cell, []).append(food)
+                    self.food_count += 1
+                    break
+
+    def eat_foods(self, i: int) -> None:
+        snake = self.snakes[i]
+        head = snake.key_points[0]
+        cx, cy = math.floor(head.x), math.floor(head.y)
+        for cell in [
+            (x, y) for x in range(cx - 1, cx + 2) for y in range(cy - 1, cy + 2)
+        ]:
+            foods = self.food_cells.get(cell)
+            if not foods:
+                continue
+            kept = []
+            for food in foods:
+                if head.distance(food) < 1 or snake.is_close_to_body(food):
+                    snake.eat(food)
+                    self.food_count -= 1
+                else:
+                    kept.append(food)
+            if kept:
+                self.food_cells[cell] = kept
+            else:
+                del self.food_cells[cell]
+
+    def choose_target(self, i: int) -> None:
+        head = self.snakes[i].key_points[0]
+        self.targets[i] = min(self.get_food_samples(), key=head.distance, default=None)
+        self.retarget_times[i] = BOT_RETARGET_TIME
+
+    def get_food_samples(self) -> list[game.Food]:
+        cells = list(self.food_cells)
+        if not cells:
+            return []
+        return [
+            self.random.choice(self.food_cells[self.random.choice(cells)])
+            for _ in range(BOT_TARGET_CHOICES)
+        ]
+
+    def steer_bot(self, i: int, dt: float) -> None:
+        """Head for a food, preferring to go straight, and avoid what is ahead."""
+        self.retarget_times[i] -= dt
+        if self.retarget_times[i] < 0:
+            self.choose_target(i)
+        snake = self.snakes[i]
+        head = snake.key_points[0]
+        forward = head.orientation
+        target = self.targets[i]
+        dx = target.x - head.x if target else 0
+        dy = target.y - head.y if target else 0
+
+        def get_probe(orientation: game.SnakeOrientation) -> game.SnakeKeyPoint:
+            mx, my = DIRECTIONS[orientation.value]
+            return game.SnakeKeyPoint(
+                head.x + mx * BOT_LOOKAHEAD, head.y + my * BOT_LOOKAHEAD, orientation
+            )
+
+        def score(orientation: game.SnakeOrientation) -> float:
+            mx, my = DIRECTIONS[orientation.value]
+            return mx * dx + my * dy
+
+        if score(forward) > 0.5 and not self.is_blocked(i, get_probe(forward)):
+            return
+        turns = [
+            v for v in TURNS[forward.value] if not self.is_blocked(i, get_probe(v))
+        ]
+        if turns:
+            best = max(turns, key=score)
+            if score(best) > 0.5 or self.is_blocked(i, get_probe(forward)):
+                snake.set_orientation(best)
+
+    def update(self, dt: float) -> None:
+        if self.end != 0:
+            return
+        speed = max(
+            (v.get_speed() for v, alive in zip(self.snakes, self.alive) if alive),
+            default=0,
+        )
+        substeps = max(1, math.ceil(dt * speed / config.MAX_SUBSTEP_DISTANCE))
+        for _ in range(substeps):
+            self.step(dt / substeps)
+
+    def step(self, dt: float) -> None:
+        movers = [
+            i
+            for i, alive in enumerate(self.alive)
+            if alive and (self.playing or self.is_bot(i))
+        ]
+        for i in movers:
+            if self.is_bot(i):
+                self.steer_bot(i, dt)
+            self.snakes[i].move(dt)
+        self.update_heads()
+
+        dead = []
+        for i in movers:
+            head = self.snakes[i].key_points[0]
+            if not self.is_inside(head):
+                dead.append((i, 1))
+            elif self.is_blocked(i, head):
+                dead.append((i, 2))
+        for i, reason in dead:
+            self.kill(i, reason)
+        for i in movers:
+            if self.alive[i]:
+                self.eat_foods(i)
+        for i, alive in enumerate(self.alive):
+            if not alive and self.is_bot(i) and self.spawn(i):
+                self.add_head(i)
+        self.spawn_foods()
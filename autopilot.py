@@ -0,0 +1,522 @@
+import heapq
+import math
+import time
+from collections import deque
+from typing import Generator, Iterator, Optional
+import config
+import game
+
+Node = tuple[int, int]
+
+DIRECTIONS = {
+    game.SnakeOrientation.UP: (0, -1),
+    game.SnakeOrientation.LEFT: (-1, 0),
+    game.SnakeOrientation.RIGHT: (1, 0),
+    game.SnakeOrientation.DOWN: (0, 1),
+}
+ORIENTATIONS = {v: k for k, v in DIRECTIONS.items()}
+FOOD_VALUES = {
+    game.FoodType.NORMAL: 1.0,
+    game.FoodType.DOUBLESCORE: 2.0,
+    game.FoodType.SPEEDUP: 0.5,
+    game.FoodType.SLOWDOWN: 1.0,
+}
+SPACE_SEARCH_LIMIT = 128
+
+
+def get_hamiltonian_cycle(nx: int, ny: int) -> list[Node]:
+    """Return the nodes of an nx by ny lattice in the order of a cycle through
+    all of them. If both sides are odd the last row is left out."""
+    transpose = ny % 2 == 1 and nx % 2 == 0
+    if transpose:
+        nx, ny = ny, nx
+    ny -= ny % 2
+    order = [(x, 0) for x in range(nx)]
+    for y in range(1, ny):
+        xs = range(nx - 1, 0, -1) if y % 2 == 1 else range(1, nx)
+        order += [(x, y) for x in xs]
+    order += [(0, y) for y in range(ny - 1, 0, -1)]
+    if transpose:
+        order = [(y, x) for x, y in order]
+    return order
+
+
+def get_segment_distance(
+    x1: float, y1: float, x2: float, y2: float, pos: game.GamePoint
+) -> float:
+    dx = x2 - x1
+    dy = y2 - y1
+    t = ((pos.x - x1) * dx + (pos.y - y1) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    return math.hypot(x1 + t * dx - pos.x, y1 + t * dy - pos.y)
+
+
+class Autopilot:
+    """Plays the game by steering the snake along a lattice of lanes two
+    units apart, far enough that turning a little late never brings two
+    parts of the body within one unit of each other.
+
+    plan runs A* towards a food on the lattice, for at most ``budget_us`` per
+    call, resuming on the next call; with a ``node_budget`` it stops after
+    that many search steps instead, so that games with the same seed play
+    out the same on any machine. A node taken by the body counts as free
+    once the tail will have left it by the time the head gets there, and the
+    path is checked against that again at every node, so only the part after
+    a conflict is searched again. Without a path, and always once the snake
+    is long, steer follows a Hamiltonian cycle of the lattice, or the
+    neighbour with the most room, which plan also works out within the
+    budget before the head gets to the node.
+
+    Instead of walking the body, the autopilot keeps how far the head had
+    gone when it passed each node; the tail leaves the node once it has
+    gone as far.
+
+    The autopilot is a headless.Policy; in the launcher, plan is called once
+    per frame and steer before every simulation sub-step.
+    """
+
+    def __init__(
+        self,
+        budget_us: int = config.AUTOPILOT_BUDGET_US,
+        prefer_valuable: bool = True,
+        node_budget: Optional[int] = None,
+    ) -> None:
+        self.budget_ns = budget_us * 1000
+        self.node_budget = node_budget
+        self.nodes = 0
+        self.prefer_valuable = prefer_valuable
+        self.manager: Optional[game.GameManager] = None
+        self.key_points = None
+
+    def __call__(self, manager: game.GameManager) -> Optional[game.SnakeOrientation]:
+        self.plan(manager)
+        return self.steer(manager)
+
+    def reset(self, manager: game.GameManager) -> None:
+        self.manager = manager
+        self.key_points = manager.snake.key_points
+        head = self.key_points[0]
+        # Lanes run through the starting position of the head.
+        self.ox = head.x - 2 * math.floor((head.x - 1) / 2)
+        self.oy = head.y - 2 * math.floor((head.y - 1) / 2)
+        self.nx = math.ceil((manager.width - 1 - self.ox) / 2)
+        self.ny = math.ceil((manager.height - 1 - self.oy) / 2)
+        self.cycle = get_hamiltonian_cycle(self.nx, self.ny)
+        self.cycle_index = {v: i for i, v in enumerate(self.cycle)}
+        self.heading: Optional[Node] = None
+        self.direction: Optional[tuple[int, int]] = None
+        self.path: deque[Node] = deque()
+        self.path_complete = False
+        self.target: Optional[game.Food] = None
+        self.failed: Optional[game.Food] = None
+        self.search: Optional[Iterator[Optional[list[Node]]]] = None
+        self.search_anchor: Optional[Node] = None
+        self.fallback: Optional[list[Node]] = None
+        self.fallback_node: Optional[Node] = None
+        self.fallback_search: Optional[Iterator[Optional[list[Node]]]] = None
+        self.deadline = 0
+        # Distance the head has moved, and where it was at each node.
+        self.odometer = 0.0
+        self.head_x = head.x
+        self.head_y = head.y
+        self.entered: dict[Node, float] = {}
+        self.entries: deque[tuple[Node, float]] = deque()
+
+    def sync(self, manager: game.GameManager) -> None:
+        if (
+            manager is not self.manager
+            or manager.snake.key_points is not self.key_points
+        ):
+            self.reset(manager)
+
+    def get_position(self, node: Node) -> tuple[float, float]:
+        return self.ox + 2 * node[0], self.oy + 2 * node[1]
+
+    def get_nearest_node(self, x: float, y: float) -> Node:
+        i = round((x - self.ox) / 2)
+        j = round((y - self.oy) / 2)
+        return max(0, min(self.nx - 1, i)), max(0, min(self.ny - 1, j))
+
+    def contains(self, node: Node) -> bool:
+        return 0 <= node[0] < self.nx and 0 <= node[1] < self.ny
+
+    def get_cycle_distance(self, a: Node, b: Node) -> int:
+        """Steps from a to b along the cycle, or -1 if one is not on it."""
+        if a not in self.cycle_index or b not in self.cycle_index:
+            return -1
+        return (self.cycle_index[b] - self.cycle_index[a]) % len(self.cycle)
+
+    def get_cycle_limit(self, start: Node) -> int:
+        """How far ahead of start along the cycle a path may go without
+        catching up with the tail, leaving room for the snake to grow."""
+        snake = self.manager.snake
+        tail = self.key_points[-1]
+        distance = self.get_cycle_distance(start, self.get_nearest_node(tail.x, tail.y))
+        if distance <= 0:
+            return 0
+        pending = max(0.0, snake.length - snake.length_sum)
+        return distance - math.ceil(pending / 2) - 3
+
+    def is_late(self) -> bool:
+        if self.node_budget is not None:
+            self.nodes += 1
+            return self.nodes > self.node_budget
+        return time.perf_counter_ns() > self.deadline
+
+    def move_head(self) -> None:
+        """Follow the head, and forget the nodes the tail has left by more
+        than one unit."""
+        head = self.key_points[0]
+        self.odometer += abs(head.x - self.head_x) + abs(head.y - self.head_y)
+        self.head_x = head.x
+        self.head_y = head.y
+        tail = self.odometer - self.manager.snake.length_sum
+        while self.entries and self.entries[0][1] + 1 < tail:
+            node, distance = self.entries.popleft()
+            if self.entered.get(node) == distance:
+                del self.entered[node]
+
+    def enter(self, node: Node) -> None:
+        """Record how far the head had gone when it was at the node."""
+        x, y = self.get_position(node)
+        distance = self.odometer - abs(self.head_x - x) - abs(self.head_y - y)
+        self.entered[node] = distance
+        self.entries.append((node, distance))
+
+    def get_tail(self, ahead: float = 0) -> float:
+        """How far the head had gone when it passed a node that, ``ahead``
+        units from now, is just free of the tail, with one unit to spare
+        and the growth still to come."""
+        snake = self.manager.snake
+        return self.odometer + ahead - max(snake.length, snake.length_sum) - 2
+
+    def is_free(self, tail: float, node: Node, steps: int) -> bool:
+        """Whether the node is free after the head moves the given number of
+        steps from where get_tail gave ``tail``."""
+        return self.entered.get(node, -math.inf) - tail < 2 * steps
+
+    def count_space(
+        self, tail: float, start: Node, steps: int = 1
+    ) -> Generator[None, None, int]:
+        """Count the nodes reachable from start, reached after the given number
+        of steps, up to SPACE_SEARCH_LIMIT. Yields None whenever the deadline
+        has passed, and returns the count."""
+        seen = {start}
+        queue = deque([(start, steps)])
+        while queue and len(seen) < SPACE_SEARCH_LIMIT:
+            if self.is_late():
+                yield None
+            node, steps = queue.popleft()
+            for dx, dy in DIRECTIONS.values():
+                nxt = (node[0] + dx, node[1] + dy)
+                if nxt in seen or not self.contains(nxt):
+                    continue
+                if self.is_free(tail, nxt, steps + 1):
+                    seen.add(nxt)
+                    queue.append((nxt, steps + 1))
+        return len(seen)
+
+    def get_candidates(
+        self, node: Node, direction: Optional[tuple[int, int]], tail: float
+    ) -> list[Node]:
+        candidates = []
+        for dx, dy in DIRECTIONS.values():
+            if direction == (-dx, -dy):
+                continue
+            nxt = (node[0] + dx, node[1] + dy)
+            if self.contains(nxt) and self.is_free(tail, nxt, 1):
+                candidates.append(nxt)
+        return candidates
+
+    def get_successor(self, node: Node) -> Optional[Node]:
+        if node not in self.cycle_index:
+            return None
+        return self.cycle[(self.cycle_index[node] + 1) % len(self.cycle)]
+
+    def search_fallback(
+        self, node: Node, direction: Optional[tuple[int, int]]
+    ) -> Iterator[Optional[list[Node]]]:
+        """Choose where to go from node without a path: the next node of the
+        cycle if there is room after it, otherwise the neighbour with the most
+        room. Yields None whenever the deadline has passed, then a list of the
+        choice, which is empty if no neighbour will be free."""
+        if self.is_late():
+            yield None
+        x, y = self.get_position(node)
+        tail = self.get_tail(abs(x - self.head_x) + abs(y - self.head_y))
+        candidates = self.get_candidates(node, direction, tail)
+        if not candidates:
+            yield []
+            return
+        successor = self.get_successor(node)
+        if successor in candidates:
+            space = yield from self.count_space(tail, successor)
+            if space >= self.get_required_space():
+                yield [successor]
+                return
+        spaces = {}
+        for v in candidates:
+            spaces[v] = yield from self.count_space(tail, v)
+        yield [max(candidates, key=spaces.get)]
+
+    def get_quick_fallback(self, node: Node, tail: float) -> Optional[Node]:
+        """The fallback when plan has not chosen one in time: the next node of
+        the cycle, or else the neighbour with the most free neighbours."""
+        candidates = self.get_candidates(node, self.direction, tail)
+        if not candidates:
+            return None
+        successor = self.get_successor(node)
+        if successor in candidates:
+            return successor
+        return max(
+            candidates,
+            key=lambda v: sum(
+                self.contains(w) and self.is_free(tail, w, 2)
+                for w in [(v[0] + dx, v[1] + dy) for dx, dy in DIRECTIONS.values()]
+            ),
+        )
+
+    def get_required_space(self) -> int:
+        """Nodes the head needs in front of it to be able to follow the tail."""
+        return min(SPACE_SEARCH_LIMIT, self.manager.snake.length // 2 + 4)
+
+    def is_reachable(self, food: game.Food) -> bool:
+        """Whether some lane passes close enough to the food to eat it."""
+        x, y = self.get_nearest_node(food.x, food.y)
+        return any(
+            self.eats((x, y), (x + dx, y + dy), food)
+            for dx, dy in DIRECTIONS.values()
+            if self.contains((x + dx, y + dy))
+        )
+
+    def choose_target(self, start: Node) -> Optional[game.Food]:
+        foods = [
+            v
+            for v in self.manager.foods
+            if v is not self.failed and self.is_reachable(v)
+        ]
+        if not foods:
+            return None
+
+        def distance(food: game.Food) -> int:
+            x, y = self.get_nearest_node(food.x, food.y)
+            return abs(x - start[0]) + abs(y - start[1])
+
+        if self.prefer_valuable:
+            return max(foods, key=lambda v: FOOD_VALUES[v.type] / (distance(v) + 1))
+        return min(foods, key=distance)
+
+    def eats(self, a: Node, b: Node, food: game.Food) -> bool:
+        return (
+            get_segment_distance(*self.get_position(a), *self.get_position(b), food)
+            < 0.9
+        )
+
+    def find_path(
+        self,
+        start: Node,
+        start_steps: int,
+        direction: Optional[tuple[int, int]],
+        tail: float,
+        food: game.Food,
+    ) -> Iterator[Optional[list[Node]]]:
+        """A* from start until an edge passes the food. Yields None whenever
+        the deadline has passed, then the path, which is empty if none exists.
+
+        Every step has to move forward along the Hamiltonian cycle without
+        getting closer than ``limit`` to the tail. The body then always lies
+        in cycle order behind the head, so the snake can always go on along
+        the cycle.
+        """
+        tx, ty = self.get_nearest_node(food.x, food.y)
+        limit = self.get_cycle_limit(start)
+        parents: dict[Node, Optional[Node]] = {start: None}
+        costs = {start: 0}
+        heap = [(0, 0, start)]
+        while heap:
+            _, g, node = heapq.heappop(heap)
+            if g > costs[node]:
+                continue
+            if self.is_late():
+                yield None
+            parent = parents[node]
+            for dx, dy in DIRECTIONS.values():
+                nxt = (node[0] + dx, node[1] + dy)
+                if nxt == parent or not self.contains(nxt):
+                    continue
+                if parent is None and direction == (-dx, -dy):
+                    continue
+                progress = self.get_cycle_distance(start, nxt)
+                if not self.get_cycle_distance(start, node) < progress < limit:
+                    continue
+                if not self.is_free(tail, nxt, start_steps + g + 1):
+                    continue
+                if self.eats(node, nxt, food):
+                    path = [nxt, node]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    yield path[::-1]
+                    return
+                if g + 1 < costs.get(nxt, g + 2):
+                    costs[nxt] = g + 1
+                    parents[nxt] = node
+                    h = max(0, abs(nxt[0] - tx) + abs(nxt[1] - ty) - 1)
+                    heapq.heappush(heap, (g + 1 + h, g + 1, nxt))
+        yield []
+
+    def start_search(self) -> None:
+        """Search from the end of the path, or from the node the head is
+        heading for."""
+        if self.path:
+            anchor = self.path[-1]
+            steps = len(self.path)
+            if len(self.path) >= 2:
+                previous = self.path[-2]
+                direction = (anchor[0] - previous[0], anchor[1] - previous[1])
+            else:
+                direction = self.direction
+        else:
+            anchor = self.heading
+            steps = 1
+            direction = self.direction
+        self.search = self.search_path(anchor, steps, direction)
+        self.search_anchor = anchor
+
+    def search_path(
+        self, anchor: Node, steps: int, direction: Optional[tuple[int, int]]
+    ) -> Iterator[Optional[list[Node]]]:
+        """Choose a food and find a path to it, like find_path."""
+        if self.is_late():
+            yield None
+        if self.target not in self.manager.foods or self.target is self.failed:
+            self.target = self.choose_target(anchor)
+        if self.target is None:
+            yield []
+            return
+        yield from self.find_path(
+            anchor, steps, direction, self.get_tail(), self.target
+        )
+
+    def plan(self, manager: game.GameManager) -> None:
+        """Choose the fallback for the next node if the path does not go on
+        from there, then search for a path, all within the time budget."""
+        self.sync(manager)
+        if manager.end or self.heading is None:
+            self.search = None
+            self.fallback_search = None
+            return
+        self.deadline = time.perf_counter_ns() + self.budget_ns
+        self.nodes = 0
+        if self.fallback is None and len(self.path) < 2:
+            if self.fallback_search is None:
+                self.fallback_search = self.search_fallback(
+                    self.heading, self.direction
+                )
+            result = next(self.fallback_search)
+            if result is None:
+                return
+            self.fallback_search = None
+            self.fallback = result
+            self.fallback_node = self.heading
+        if self.search is None:
+            if self.path_complete and self.target in manager.foods:
+                return
+            self.start_search()
+        result = next(self.search)
+        if result is None:
+            return
+        self.search = None
+        if not result:
+            # Try again from the next node, the body will have moved on.
+            self.failed = self.target
+            return
+        anchor = self.search_anchor
+        if self.path and self.path[-1] == anchor:
+            self.path.extend(result[1:])
+            self.path_complete = True
+        elif not self.path and self.heading == anchor:
+            self.path.extend(result)
+            self.path_complete = True
+
+    def steer(self, manager: game.GameManager) -> Optional[game.SnakeOrientation]:
+        """Return a new orientation when the head reaches a lattice node."""
+        self.sync(manager)
+        if manager.end:
+            return None
+        self.move_head()
+        head = self.key_points[0]
+        if not manager.playing:
+            self.heading = self.get_nearest_node(head.x, head.y)
+            self.direction = None
+            return self.arrive()
+        if self.direction != DIRECTIONS[head.orientation]:
+            self.resync()
+        dx, dy = self.direction
+        x, y = self.get_position(self.heading)
+        if (head.x - x) * dx + (head.y - y) * dy < 0:
+            return None
+        return self.arrive()
+
+    def resync(self) -> None:
+        """Head for the next node in the direction the snake is moving."""
+        head = self.key_points[0]
+        dx, dy = DIRECTIONS[head.orientation]
+        u = (head.x - self.ox) / 2
+        v = (head.y - self.oy) / 2
+        if dx:
+            i = math.floor(u) + 1 if dx > 0 else math.ceil(u) - 1
+            self.heading = (i, round(v))
+        else:
+            j = math.floor(v) + 1 if dy > 0 else math.ceil(v) - 1
+            self.heading = (round(u), j)
+        self.direction = (dx, dy)
+        self.path.clear()
+        self.path_complete = False
+        self.search = None
+        self.fallback = None
+        self.fallback_search = None
+
+    def arrive(self) -> Optional[game.SnakeOrientation]:
+        node = self.heading
+        self.enter(node)
+        self.failed = None
+        fallback = self.fallback
+        self.fallback = None
+        self.fallback_search = None
+        if self.path and self.path[0] == node:
+            self.path.popleft()
+        else:
+            self.path.clear()
+            self.path_complete = False
+        tail = self.get_tail()
+        for i, v in enumerate(self.path):
+            if not self.is_free(tail, v, i + 1):
+                for _ in range(len(self.path) - i):
+                    self.path.pop()
+                self.path_complete = False
+                self.search = None
+                break
+        if self.path:
+            nxt = self.path[0]
+        else:
+            self.path_complete = False
+            self.search = None
+            if (
+                fallback
+                and self.fallback_node == node
+                and self.is_free(tail, fallback[0], 1)
+            ):
+                nxt = fallback[0]
+            else:
+                nxt = self.get_quick_fallback(node, tail)
+        if nxt is None:
+            dx, dy = self.direction or DIRECTIONS[self.key_points[0].orientation]
+            self.heading = (node[0] + dx, node[1] + dy)
+            return None
+        direction = (nxt[0] - node[0], nxt[1] - node[1])
+        self.heading = nxt
+        changed = direction != self.direction
+        self.direction = direction
+        if changed or not self.manager.playing:
+            return ORIENTATIONS[direction]
+        return None
@@ -0,0 +1,387 @@
+from typing import Optional
+import numpy as np
+import config
+import game
+
+# Indexed by SnakeOrientation.value, like the tables in game.Snake.
+XMOVE = np.array([0.0, -1.0, 1.0, 0.0])
+YMOVE = np.array([-1.0, 0.0, 0.0, 1.0])
+XCHANGE = np.array([0.0, 1.0, -1.0, 0.0])
+YCHANGE = np.array([1.0, 0.0, 0.0, -1.0])
+
+MAX_FOODS = 3
+NO_ACTION = -1
+
+
+class BatchGameManager:
+    """Advance many independent games at once with the rules of game.GameManager.
+
+    The state of every game lives in NumPy arrays indexed by game. Key points
+    are kept in a ring buffer per game whose slot ``head`` holds the snake head
+    and the following ``count - 1`` slots hold the rest of the body, ordered
+    from the head to the tail like ``Snake.key_points``.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        width: int = config.GAME_WIDTH,
+        height: int = config.GAME_HEIGHT,
+        seed: Optional[int] = None,
+        capacity: int = 16,
+    ) -> None:
+        self.n = n
+        self.width = width
+        self.height = height
+        self.random = np.random.default_rng(seed)
+        self.capacity = capacity
+        self.key_x = np.zeros((n, capacity))
+        self.key_y = np.zeros((n, capacity))
+        self.key_orientation = np.zeros((n, capacity), dtype=np.int8)
+        self.head = np.zeros(n, dtype=np.intp)
+        self.count = np.ones(n, dtype=np.intp)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.length_sum = np.zeros(n)
+        self.state = np.zeros(n, dtype=np.int8)
+        self.state_time = np.zeros(n)
+        self.food_x = np.zeros((n, MAX_FOODS))
+        self.food_y = np.zeros((n, MAX_FOODS))
+        self.food_type = np.zeros((n, MAX_FOODS), dtype=np.int8)
+        self.food_count = np.zeros(n, dtype=np.intp)
+        self.food_time = np.zeros(n)
+        self.end = np.zeros(n, dtype=np.int8)
+        self.playing = np.zeros(n, dtype=bool)
+        # Whether the last food spawn of the game found no free cell.
+        self.board_full = np.zeros(n, dtype=bool)
+        self.reset()
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> None:
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self.head[mask] = 0
+        self.count[mask] = 1
+        self.key_x[mask, 0] = self.width / 2
+        self.key_y[mask, 0] = self.height / 2
+        self.key_orientation[mask, 0] = game.SnakeOrientation.LEFT.value
+        self.length[mask] = config.SNAKE_INITIAL_LENGTH
+        self.length_sum[mask] = 0.0
+        self.state[mask] = game.SnakeState.NORMAL.value
+        self.state_time[mask] = 0.0
+        self.food_count[mask] = 0
+        self.end[mask] = 0
+        self.playing[mask] = False
+        self.board_full[mask] = False
+        speed = self.get_speed()
+        self.food_time[mask] = max(self.width, self.height) / speed[mask] * 0.45
+
+    def get_speed(self) -> np.ndarray:
+        speed = (self.length + 5) / 2
+        speed = np.where(self.state == game.SnakeState.SPEEDUP.value, speed * 2, speed)
+        speed = np.where(self.state == game.SnakeState.SLOWDOWN.value, speed / 2, speed)
+        return speed
+
+    def get_score(self) -> np.ndarray:
+        return self.length - config.SNAKE_INITIAL_LENGTH
+
+    def get_key_points(self, columns: Optional[int] = None) -> tuple[np.ndarray, ...]:
+        """Return x, y and orientation of the key points ordered from the head."""
+        if columns is None:
+            columns = self.count.max()
+        idx = (self.head[:, None] + np.arange(columns)) % self.capacity
+        return (
+            np.take_along_axis(self.key_x, idx, 1),
+            np.take_along_axis(self.key_y, idx, 1),
+            np.take_along_axis(self.key_orientation, idx, 1),
+        )
+
+    def grow(self) -> None:
+        x, y, o = self.get_key_points(self.capacity)
+        self.capacity *= 2
+        self.key_x = np.zeros((self.n, self.capacity))
+        self.key_y = np.zeros((self.n, self.capacity))
+        self.key_orientation = np.zeros((self.n, self.capacity), dtype=np.int8)
+        self.key_x[:, : x.shape[1]] = x
+        self.key_y[:, : y.shape[1]] = y
+        self.key_orientation[:, : o.shape[1]] = o
+        self.head[:] = 0
+
+    def set_snake_orientations(self, actions: np.ndarray) -> None:
+        """Apply GameManager.set_snake_orientation to every game with an action.
+
+        ``actions`` holds a SnakeOrientation value per game, or NO_ACTION.
+        """
+        active = (actions != NO_ACTION) & (self.end == 0)
+        self.playing |= active
+        rows = np.arange(self.n)
+        second = (self.head + 1) % self.capacity
+        hx = self.key_x[rows, self.head]
+        hy = self.key_y[rows, self.head]
+        ho = self.key_orientation[rows, self.head]
+        distance = np.sqrt(
+            (hx - self.key_x[rows, second]) ** 2 + (hy - self.key_y[rows, second]) ** 2
+        )
+        blocked = (self.count >= 2) & (
+            (actions == ho) | (distance <= 1) | (ho + actions == 3)
+        )
+        rows = np.nonzero(active & ~blocked)[0]
+        if rows.size == 0:
+            return
+        if self.count[rows].max() >= self.capacity:
+            self.grow()
+        old_head = self.head[rows]
+        new_head = (old_head - 1) % self.capacity
+        self.key_x[rows, new_head] = self.key_x[rows, old_head]
+        self.key_y[rows, new_head] = self.key_y[rows, old_head]
+        self.key_orientation[rows, new_head] = actions[rows]
+        self.head[rows] = new_head
+        self.count[rows] += 1
+
+    def get_body(
+        self, x: np.ndarray, y: np.ndarray, o: np.ndarray, count: np.ndarray
+    ) -> tuple[np.ndarray, ...]:
+        """Precompute the segments Snake.is_close_to_body tests against."""
+        k1x = x[:, :-1]
+        k1y = y[:, :-1]
+        k2x = x[:, 1:]
+        k2y = y[:, 1:]
+        valid = np.arange(k1x.shape[1]) < (count - 1)[:, None]
+        distance = np.sqrt((k1x - k2x) ** 2 + (k1y - k2y) ** 2)
+        length_sum = np.cumsum(np.where(valid, distance, 0.0), axis=1)
+        last_sum = np.zeros_like(length_sum)
+        last_sum[:, 1:] = length_sum[:, :-1]
+        # The first unit of the body behind the head never collides.
+        shift = (length_sum > 1) & (last_sum < 1)
+        k1x = np.where(shift, k1x + XCHANGE[o[:, :-1]] * (1 - last_sum), k1x)
+        k1y = np.where(shift, k1y + YCHANGE[o[:, :-1]] * (1 - last_sum), k1y)
+        considered = valid & ~(length_sum < 1)
+        return k1x, k1y, k2x, k2y, considered
+
+    @staticmethod
+    def is_close_to_body(
+        body: tuple[np.ndarray, ...], px: np.ndarray, py: np.ndarray
+    ) -> np.ndarray:
+        """Vectorised Snake.is_close_to_body for points of shape (games, points)."""
+        k1x, k1y, k2x, k2y, considered = (v[:, None, :] for v in body)
+        px = px[:, :, None]
+        py = py[:, :, None]
+        close = np.sqrt((k2x - px) ** 2 + (k2y - py) ** 2) < 1
+        vertical = k1x == k2x
+        close |= (
+            vertical
+            & (np.minimum(k1y, k2y) < py)
+            & (py < np.maximum(k1y, k2y))
+            & (np.abs(k1x - px) < 1)
+        )
+        close |= (
+            ~vertical
+            & (np.minimum(k1x, k2x) < px)
+            & (px < np.maximum(k1x, k2x))
+            & (np.abs(k1y - py) < 1)
+        )
+        return (close & considered).any(axis=2)
+
+    def move(self, run: np.ndarray, dt: float) -> None:
+        """Snake.move for every game in ``run``."""
+        self.state_time[run] -= dt
+        self.state[run & (self.state_time < 0)] = game.SnakeState.NORMAL.value
+        rows = np.nonzero(run)[0]
+        head = self.head[rows]
+        orientation = self.key_orientation[rows, head]
+        step_size = dt * self.get_speed()[rows]
+        self.key_x[rows, head] += step_size * XMOVE[orientation]
+        self.key_y[rows, head] += step_size * YMOVE[orientation]
+
+        self.length_sum[rows] += np.where(self.count[rows] >= 2, step_size, 0.0)
+
+        rows = np.nonzero(run & (self.length_sum > self.length))[0]
+        if rows.size == 0:
+            return
+        # Walk from the tail like the scalar loop: popped[:, m] is the length
+        # left after dropping m tail segments, computed in the same order.
+        count = self.count[rows]
+        reverse = (count - 2)[:, None] - np.arange(count.max() - 1)
+        valid = reverse >= 0
+        before = (self.head[rows, None] + np.maximum(reverse, 0)) % self.capacity
+        last = (before + 1) % self.capacity
+        r = rows[:, None]
+        last_length = np.where(
+            valid,
+            np.sqrt(
+                (self.key_x[r, last] - self.key_x[r, before]) ** 2
+                + (self.key_y[r, last] - self.key_y[r, before]) ** 2
+            ),
+            0.0,
+        )
+        popped = np.subtract.accumulate(
+            np.concatenate([self.length_sum[rows, None], last_length], axis=1), axis=1
+        )
+        surplus = popped[:, :-1] - self.length[rows, None]
+        stop = (last_length > surplus) & valid
+        found = stop.any(axis=1)
+        m = np.where(found, stop.argmax(axis=1), count - 1)
+        self.count[rows] = count - m
+        self.length_sum[rows] = np.where(
+            found, self.length[rows], popped[np.arange(rows.size), m]
+        )
+
+        i = np.nonzero(found)[0]
+        m = m[i]
+        rows = rows[i]
+        last = last[i, m]
+        before = before[i, m]
+        last_length = last_length[i, m]
+        surplus = surplus[i, m]
+        lx = self.key_x[rows, last]
+        ly = self.key_y[rows, last]
+        self.key_x[rows, last] = (
+            lx - (lx - self.key_x[rows, before]) / last_length * surplus
+        )
+        self.key_y[rows, last] = (
+            ly - (ly - self.key_y[rows, before]) / last_length * surplus
+        )
+
+    def eat(self, rows: np.ndarray, food_type: np.ndarray) -> None:
+        """Snake.eat for the given games, one food each."""
+        self.length[rows] += 1
+        self.length[rows[food_type == game.FoodType.DOUBLESCORE.value]] += 1
+        for kind, state, time in [
+            (game.FoodType.SPEEDUP, game.SnakeState.SPEEDUP, 100),
+            (game.FoodType.SLOWDOWN, game.SnakeState.SLOWDOWN, 50),
+        ]:
+            selected = rows[food_type == kind.value]
+            self.state[selected] = state.value
+            self.state_time[selected] = time / self.get_speed()[selected]
+
+    def sample_coordinate(
+        self, size: int, low: float, high: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Draw from the normal distribution centred between low and high, and
+        tell which draws fall inside; the others count as rejected tries."""
+        mu = (low + high) / 2
+        sigma = (high - low) / 4
+        values = self.random.normal(mu, sigma, size)
+        return values, (low < values) & (values < high)
+
+    def is_board_full(self, row: int) -> bool:
+        """Whether the body of one game covers every cell, like
+        FoodSpawner.positions returning None. As in SegmentGrid, the segment
+        at the head does not count."""
+        covered = np.zeros((self.width - 1, self.height - 1), dtype=bool)
+        slots = (self.head[row] + np.arange(self.count[row])) % self.capacity
+        points = [
+            game.SnakeKeyPoint(
+                self.key_x[row, i],
+                self.key_y[row, i],
+                game.SnakeOrientation(self.key_orientation[row, i]),
+            )
+            for i in slots
+        ]
+        for k1, k2 in zip(points[1:], points[2:]):
+            vertical, fixed, span = game.get_covered_cells(k1, k2)
+            span = range(max(span.start, 0), span.stop)
+            if vertical and 0 <= fixed < covered.shape[0]:
+                covered[fixed, span.start : span.stop] = True
+            elif not vertical and 0 <= fixed < covered.shape[1]:
+                covered[span.start : span.stop, fixed] = True
+        return bool(covered.all())
+
+    def create_new_foods(
+        self,
+        rows: np.ndarray,
+        body: tuple[np.ndarray, ...],
+        hx: np.ndarray,
+        hy: np.ndarray,
+    ) -> np.ndarray:
+        """GameManager.create_new_food for the given games, returning the
+        FoodSpawn value of each. Every game gets at most FOOD_SPAWN_ATTEMPTS
+        tries."""
+        result = np.full(rows.size, game.FoodSpawn.RETRY.value, dtype=np.int8)
+        pending = np.arange(rows.size)
+        for _ in range(config.FOOD_SPAWN_ATTEMPTS):
+            if not pending.size:
+                break
+            tried = rows[pending]
+            x, x_inside = self.sample_coordinate(tried.size, 0, self.width - 1)
+            y, y_inside = self.sample_coordinate(tried.size, 0, self.height - 1)
+            food_type = np.where(
+                self.random.integers(10, size=tried.size) < 7,
+                game.FoodType.NORMAL.value,
+                self.random.integers(len(game.FoodType), size=tried.size),
+            )
+            valid = np.arange(MAX_FOODS) < self.food_count[tried, None]
+            near_food = (self.food_x[tried] - x[:, None]) ** 2 + (
+                self.food_y[tried] - y[:, None]
+            ) ** 2 < 1
+            rejected = ~(x_inside & y_inside)
+            rejected |= (near_food & valid).any(axis=1)
+            rejected |= (hx[tried] - x) ** 2 + (hy[tried] - y) ** 2 < 1
+            rejected |= self.is_close_to_body(
+                tuple(v[tried] for v in body), x[:, None], y[:, None]
+            )[:, 0]
+            accepted = tried[~rejected]
+            slot = self.food_count[accepted]
+            self.food_x[accepted, slot] = x[~rejected]
+            self.food_y[accepted, slot] = y[~rejected]
+            self.food_type[accepted, slot] = food_type[~rejected]
+            self.food_count[accepted] += 1
+            result[pending[~rejected]] = game.FoodSpawn.SPAWNED.value
+            pending = pending[rejected]
+        for i in pending:
+            if self.is_board_full(rows[i]):
+                result[i] = game.FoodSpawn.BOARD_FULL.value
+        return result
+
+    def update(self, dt: float) -> None:
+        """GameManager.update for every game."""
+        run = self.playing & (self.end == 0)
+        if not run.any():
+            return
+        self.move(run, dt)
+
+        x, y, o = self.get_key_points()
+        hx = x[:, 0]
+        hy = y[:, 0]
+        body = self.get_body(x, y, o, self.count)
+        outside = ~((0 < hx) & (hx < self.width - 1)) | ~(
+            (0 < hy) & (hy < self.height - 1)
+        )
+        self.end[run & outside] = 1
+        hit = self.is_close_to_body(body, hx[:, None], hy[:, None])[:, 0]
+        self.end[run & hit] = 2
+
+        valid = np.arange(MAX_FOODS) < self.food_count[:, None]
+        eaten = self.is_close_to_body(body, self.food_x, self.food_y)
+        eaten |= (
+            np.sqrt((hx[:, None] - self.food_x) ** 2 + (hy[:, None] - self.food_y) ** 2)
+            < 1
+        )
+        eaten &= valid & run[:, None]
+        if eaten.any():
+            for i in range(MAX_FOODS):
+                rows = np.nonzero(eaten[:, i])[0]
+                self.eat(rows, self.food_type[rows, i])
+            kept = valid & ~eaten
+            order = np.argsort(~kept, axis=1, kind="stable")
+            self.food_x = np.take_along_axis(self.food_x, order, 1)
+            self.food_y = np.take_along_axis(self.food_y, order, 1)
+            self.food_type = np.take_along_axis(self.food_type, order, 1)
+            self.food_count = kept.sum(axis=1)
+
+        self.food_time[run] += dt
+        speed = self.get_speed()
+        size = max(self.width, self.height)
+        self.food_time = np.where(
+            run & (self.food_count >= 3), size / speed / 4, self.food_time
+        )
+        spawn = run & (self.food_time > size / speed / 2)
+        if spawn.any():
+            rows = np.nonzero(spawn)[0]
+            result = self.create_new_foods(rows, body, hx, hy)
+            self.board_full[rows] = result == game.FoodSpawn.BOARD_FULL.value
+            # After a retry the timer keeps running, so the next update tries again.
+            self.food_time[rows[result != game.FoodSpawn.RETRY.value]] = 0
+
+    def step(self, actions: np.ndarray, dt: float = 1 / config.GAME_MAX_FPS) -> None:
+        """Apply one action per game, then advance every game by ``dt``."""
+        self.set_snake_orientations(actions)
+        self.update(dt)
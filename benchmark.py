@@ -0,0 +1,420 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import platform
+import random
+import time
+from typing import Callable, NamedTuple, Optional
+import pygame
+import arena
+import config
+import game
+import graphics
+import launcher
+import menu
+import pacing
+import text
+
+TURNS = [game.SnakeOrientation.DOWN, game.SnakeOrientation.RIGHT]
+SNAKE_TURNS = [10, 100, 1000, 10000]
+RENDER_TURNS = [10, 40]
+FOOD_COUNTS = [0, 3]
+ARENA_SNAKES = [10, 100, 300]
+BOARD_SIZES = [50, 500, 2000]
+RENDER_SCALE_BOARD = 500
+
+
+class Benchmark(NamedTuple):
+    name: str
+    group: str
+    params: dict
+    setup: Callable[..., Callable[[], None]]
+
+
+def time_per_call(func: Callable[[], None], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+def measure(func: Callable[[], None], min_time: float, repeat: int = 3) -> float:
+    """Best seconds per call of ``repeat`` runs that each last about min_time."""
+    func()
+    number = 1
+    while True:
+        t = time_per_call(func, number)
+        if t * number >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, math.ceil(min_time / max(t, 1e-9)))
+    return min(time_per_call(func, number) for _ in range(repeat))
+
+
+def make_snake(
+    key_points: int, segment_length: float = 2, x: float = 0, y: float = 0
+) -> game.Snake:
+    """Build a staircase-shaped snake with the given number of key points."""
+    snake = game.Snake()
+    snake.reset(x, y)
+    snake.length = 10**9
+    snake.set_orientation(game.SnakeOrientation.RIGHT)
+    while len(snake.key_points) < key_points:
+        snake.move(segment_length / snake.get_speed())
+        snake.set_orientation(TURNS[len(snake.key_points) % 2])
+    snake.length = int(snake.length_sum)
+    return snake
+
+
+def make_manager(turns: int, foods: int, size: int = 1000) -> game.GameManager:
+    """A game on a large board, with foods the staircase never reaches."""
+    manager = game.GameManager(size, size, seed=0)
+    manager.snake = make_snake(turns)
+    manager.playing = True
+    rng = random.Random(0)
+    while len(manager.foods) < foods:
+        manager.foods.append(
+            game.Food(rng.uniform(0, size), -10, manager.food_spawner.random_type())
+        )
+    return manager
+
+
+def make_render_manager(turns: int, foods: int) -> game.GameManager:
+    """A game whose staircase snake fits on the default board."""
+    manager = game.GameManager(config.GAME_WIDTH, config.GAME_HEIGHT, seed=0)
+    segment_length = 2 * (min(config.GAME_WIDTH, config.GAME_HEIGHT) - 4) / turns
+    manager.snake = make_snake(turns, segment_length, 2, 2)
+    while len(manager.foods) < foods:
+        manager.create_new_food()
+    return manager
+
+
+def setup_snake_move(turns: int) -> Callable[[], None]:
+    snake = make_snake(turns)
+    dt = 0.01 / snake.get_speed()
+    steps = 0
+
+    def step() -> None:
+        nonlocal steps
+        snake.move(dt)
+        steps += 1
+        if steps % 200 == 0:
+            snake.set_orientation(TURNS[steps // 200 % 2])
+
+    return step
+
+
+def setup_is_close_to_body(turns: int) -> Callable[[], None]:
+    snake = make_snake(turns)
+    extent = max(max(abs(k.x), abs(k.y)) for k in snake.key_points) + 2
+    rng = random.Random(0)
+    points = [
+        game.Food(
+            rng.uniform(-2, extent), rng.uniform(-2, extent), game.FoodType.NORMAL
+        )
+        for _ in range(256)
+    ]
+    i = 0
+
+    def query() -> None:
+        nonlocal i
+        snake.is_close_to_body(points[i % len(points)])
+        i += 1
+
+    return query
+
+
+def setup_update(turns: int, foods: int) -> Callable[[], None]:
+    manager = make_manager(turns, foods)
+    dt = 0.01 / manager.snake.get_speed()
+    steps = 0
+
+    def update() -> None:
+        nonlocal steps
+        manager.update(dt)
+        manager.end = 0
+        manager.food_time = 0
+        steps += 1
+        if steps % 200 == 0:
+            manager.set_snake_orientation(TURNS[steps // 200 % 2])
+
+    return update
+
+
+def setup_create_new_food(turns: int, foods: int) -> Callable[[], None]:
+    manager = make_render_manager(turns, foods)
+
+    def create() -> None:
+        manager.create_new_food()
+        del manager.foods[foods:]
+
+    return create
+
+
+def setup_arena_update(snakes: int) -> Callable[[], None]:
+    # The board grows with the snakes, so the density stays the same.
+    size = max(64, round(20 * math.sqrt(snakes)))
+    game_arena = arena.Arena(size, size, snakes, seed=0, player=False)
+    for _ in range(300):
+        game_arena.update(1 / config.GAME_MAX_FPS)
+    return lambda: game_arena.update(1 / config.GAME_MAX_FPS)
+
+
+def setup_fill_aacircle(ssaa: int) -> Callable[[], None]:
+    graphics.set_ssaa(ssaa)
+    surface = pygame.Surface((config.WINDOW_WIDTH, config.WINDOW_HEIGHT))
+    rng = random.Random(0)
+    positions = [
+        (rng.uniform(0, config.WINDOW_WIDTH), rng.uniform(0, config.WINDOW_HEIGHT))
+        for _ in range(64)
+    ]
+    i = 0
+
+    def fill() -> None:
+        nonlocal i
+        x, y = positions[i % len(positions)]
+        graphics.fill_aacircle(
+            surface, graphics.COLOR_DIM_GRAY, x, y, config.SNAKE_SIZE / 2
+        )
+        i += 1
+
+    return fill
+
+
+def setup_draw_snake(ssaa: int, turns: int) -> Callable[[], None]:
+    graphics.set_ssaa(ssaa)
+    surface = pygame.Surface((config.WINDOW_WIDTH, config.WINDOW_HEIGHT))
+    snake = make_render_manager(turns, 0).snake
+    return lambda: graphics.draw_snake(surface, snake)
+
+
+def setup_draw_game(ssaa: int, turns: int, foods: int) -> Callable[[], None]:
+    graphics.set_ssaa(ssaa)
+    surface = pygame.Surface((config.WINDOW_WIDTH, config.WINDOW_HEIGHT))
+    manager = make_render_manager(turns, foods)
+    return lambda: graphics.draw_game(surface, manager)
+
+
+def setup_draw_view(board: int) -> Callable[[], None]:
+    """A staircase snake across the whole board, seen by a camera on its head."""
+    surface = pygame.Surface((config.WINDOW_WIDTH, config.WINDOW_HEIGHT))
+    manager = game.GameManager(board, board, seed=0)
+    manager.snake = make_snake(board, 2 * (board - 4) / board, 2, 2)
+    camera = graphics.Camera()
+    head = manager.snake.key_points[0]
+    camera.follow(head.x, head.y, board, board)
+    return lambda: graphics.draw_game(surface, manager, True, None, camera)
+
+
+def setup_scaled_draw(scale: float) -> Callable[[], None]:
+    """A full redraw of the draw_view scene, drawn at a fraction of the window's
+    resolution and scaled up."""
+    board = RENDER_SCALE_BOARD
+    surface = pygame.Surface((config.WINDOW_WIDTH, config.WINDOW_HEIGHT))
+    manager = game.GameManager(board, board, seed=0)
+    manager.snake = make_snake(board, 2 * (board - 4) / board, 2, 2)
+    camera = graphics.Camera()
+    head = manager.snake.key_points[0]
+    camera.follow(head.x, head.y, board, board)
+    renderer = graphics.ScaledRenderer(scale)
+
+    def draw() -> None:
+        renderer.invalidate()
+        renderer.draw(surface, manager, None, camera)
+
+    return draw
+
+
+def setup_draw_menu() -> Callable[[], None]:
+    surface = pygame.Surface((config.WINDOW_WIDTH, config.WINDOW_HEIGHT))
+    start_menu = menu.Menu(["开始游戏", "帮助", "退出"])
+    start_menu.add_content(text.render("贪吃蛇", 100, graphics.COLOR_BLACK, True))
+    start_menu.add_content(pygame.Surface((0, 30)))
+    return lambda: graphics.draw_menu(surface, start_menu)
+
+
+def get_benchmarks() -> list[Benchmark]:
+    benchmarks = []
+
+    def add(name: str, group: str, setup: Callable, **params) -> None:
+        args = ",".join(f"{k}={v}" for k, v in params.items())
+        benchmarks.append(Benchmark(f"{name}[{args}]", group, params, setup))
+
+    for turns in SNAKE_TURNS:
+        add("Snake.move", "simulation", setup_snake_move, turns=turns)
+        add("Snake.is_close_to_body", "simulation", setup_is_close_to_body, turns=turns)
+        for foods in FOOD_COUNTS:
+            add(
+                "GameManager.update",
+                "simulation",
+                setup_update,
+                turns=turns,
+                foods=foods,
+            )
+    for turns in RENDER_TURNS:
+        for foods in FOOD_COUNTS:
+            add(
+                "GameManager.create_new_food",
+                "simulation",
+                setup_create_new_food,
+                turns=turns,
+                foods=foods,
+            )
+    for snakes in ARENA_SNAKES:
+        add("Arena.update", "simulation", setup_arena_update, snakes=snakes)
+    for ssaa in config.SSAA_LEVELS:
+        add("graphics.fill_aacircle", "rendering", setup_fill_aacircle, ssaa=ssaa)
+        for turns in RENDER_TURNS:
+            add(
+                "graphics.draw_snake",
+                "rendering",
+                setup_draw_snake,
+                ssaa=ssaa,
+                turns=turns,
+            )
+            for foods in FOOD_COUNTS:
+                add(
+                    "graphics.draw_game",
+                    "rendering",
+                    setup_draw_game,
+                    ssaa=ssaa,
+                    turns=turns,
+                    foods=foods,
+                )
+    for board in BOARD_SIZES:
+        add("graphics.draw_game_view", "rendering", setup_draw_view, board=board)
+    for scale in config.RENDER_SCALES:
+        add("graphics.ScaledRenderer.draw", "rendering", setup_scaled_draw, scale=scale)
+    add("graphics.draw_menu", "rendering", setup_draw_menu)
+    return benchmarks
+
+
+def run(patterns: list[str], min_time: float) -> dict:
+    pygame.init()
+    ssaa = graphics.get_ssaa()
+    results = {}
+    try:
+        for benchmark in get_benchmarks():
+            if patterns and not any(p in benchmark.name for p in patterns):
+                continue
+            seconds = measure(benchmark.setup(**benchmark.params), min_time)
+            results[benchmark.name] = {
+                "group": benchmark.group,
+                "params": benchmark.params,
+                "seconds": seconds,
+            }
+            print(f"{benchmark.name:<60} {seconds * 1e6:12.2f} us", flush=True)
+    finally:
+        graphics.set_ssaa(ssaa)
+        pygame.quit()
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def measure_idle(seconds: float, adaptive: bool) -> tuple[int, float, Optional[float]]:
+    """Show the start menu untouched for a while and return the frames drawn,
+    the CPU time used and the energy used by the CPU packages, if known."""
+    display = pygame.display.set_mode((config.WINDOW_WIDTH, config.WINDOW_HEIGHT))
+    pacer = pacing.FramePacer(adaptive=adaptive)
+    pygame.time.set_timer(pygame.QUIT, round(seconds * 1000), 1)
+    energy = pacing.read_energy()
+    cpu = time.process_time()
+    launcher.show_start_menu(display, None, pacer)
+    cpu = time.process_time() - cpu
+    if energy is not None:
+        end = pacing.read_energy()
+        energy = end - energy if end is not None else None
+    return pacer.frames, cpu, energy
+
+
+def idle_report(seconds: float) -> None:
+    pygame.init()
+    try:
+        print(f"{'pacing':<10} {'fps':>8} {'cpu':>8} {'power':>10}")
+        for name, adaptive in [("fixed", False), ("adaptive", True)]:
+            frames, cpu, energy = measure_idle(seconds, adaptive)
+            power = f"{energy / seconds:8.2f} W" if energy is not None else "n/a"
+            print(
+                f"{name:<10} {frames / seconds:8.1f} {cpu / seconds:8.1%} {power:>10}",
+                flush=True,
+            )
+    finally:
+        pygame.quit()
+
+
+def compare(base: dict, new: dict, threshold: float) -> bool:
+    """Print the ratio of every benchmark in both runs; False on regressions."""
+    ok = True
+    ratios: dict[str, list[float]] = {}
+    for name, result in new["results"].items():
+        if name not in base["results"]:
+            continue
+        ratio = result["seconds"] / base["results"][name]["seconds"]
+        ratios.setdefault(result["group"], []).append(ratio)
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  REGRESSION"
+            ok = False
+        elif ratio < 1 - threshold:
+            mark = "  improved"
+        print(f"{name:<60} {ratio:8.3f}x{mark}")
+    for group, values in ratios.items():
+        mean = math.exp(sum(math.log(v) for v in values) / len(values))
+        print(f"{group + ' (geometric mean)':<60} {mean:8.3f}x")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="pysnake benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run benchmarks")
+    run_parser.add_argument(
+        "patterns", nargs="*", help="only run benchmarks whose name contains one"
+    )
+    run_parser.add_argument("-o", "--output", help="write the results as JSON")
+    run_parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per measurement"
+    )
+    compare_parser = subparsers.add_parser("compare", help="compare two JSON results")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as a regression",
+    )
+    idle_parser = subparsers.add_parser(
+        "idle", help="CPU and power use of the untouched start menu"
+    )
+    idle_parser.add_argument(
+        "-t", "--time", type=float, default=5, help="seconds per pacing mode"
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.patterns, args.min_time)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+    elif args.command == "idle":
+        idle_report(args.time)
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        if not compare(base, new, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
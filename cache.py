@@ -0,0 +1,33 @@
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class LRUCache(Generic[T]):
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.items: OrderedDict[Hashable, T] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, create: Callable[[], T]) -> T:
+        item = self.items.get(key)
+        if item is None:
+            self.misses += 1
+            item = create()
+            self.items[key] = item
+            if len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+        else:
+            self.hits += 1
+            self.items.move_to_end(key)
+        return item
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
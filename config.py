@@ -1,9 +1,32 @@
+import os
+
 SNAKE_SIZE = 15
 GAME_WIDTH = 50
 GAME_HEIGHT = 50
 GAME_MAX_FPS = 144
-WINDOW_WIDTH = GAME_WIDTH * SNAKE_SIZE
-WINDOW_HEIGHT = GAME_HEIGHT * SNAKE_SIZE
+# Static screens wait for events instead of redrawing at GAME_MAX_FPS.
+ADAPTIVE_PACING = True
+IDLE_TIMEOUT = 0.5
+SIMULATION_TICK_RATE = 240
+# Turns that may wait for the head to get far enough from the last one.
+INPUT_QUEUE_SIZE = 3
+MAX_SUBSTEP_DISTANCE = 0.25
+MAX_FRAME_TIME = 0.2
+DIRTY_RECTS = True
+REPLAY_DIR = os.path.join(
+    os.path.expanduser("~"), ".local", "share", "pysnake", "replays"
+)
+REPLAY_KEYFRAME_INTERVAL = 2400
+FRAME_PROFILE_WINDOW = 600
+FRAME_PROFILE_PHASES = ["events", "wait", "update", "draw", "display"]
+FRAME_HUD_REFRESH = 0.5
+FRAME_HUD_FONT_NAME = "consolas,menlo,dejavusansmono,couriernew"
+FRAME_HUD_FONT_SIZE = 14
+# Cells shown in the window; larger boards scroll with the snake's head.
+VIEW_WIDTH = 50
+VIEW_HEIGHT = 50
+WINDOW_WIDTH = VIEW_WIDTH * SNAKE_SIZE
+WINDOW_HEIGHT = VIEW_HEIGHT * SNAKE_SIZE
 
 SELECTION_MAX_SIZE = 60
 SELECTION_MIN_SIZE = 40
@@ -11,11 +34,43 @@ SELECTION_SEP_SIZE = 10
 SELECT_ANIMATION_MAX_TIME = 0.2
 
 DEFAULT_TEXT_FONT_NAME = "Microsoft YaHei"
+FONT_CACHE_SIZE = 32
+TEXT_CACHE_SIZE = 256
+FONT_RESOLUTION_CACHE_FILE = os.path.join(
+    os.path.expanduser("~"), ".cache", "pysnake", "fonts.json"
+)
 
 SSAA = 4  # SSAA 16x
+SSAA_LEVELS = [1, 2, 4, 8]
+# Resolution of the game drawing relative to the window, and the steps the
+# dynamic resolution takes while frames go over or under budget.
+RENDER_SCALE = 1.0
+RENDER_SCALES = [1.0, 0.75, 0.5]
+# Largest q of the ratios p/q render scales are rounded to.
+RENDER_SCALE_BLOCK = 8
+DYNAMIC_RESOLUTION_WINDOW = 30
+DYNAMIC_RESOLUTION_HEADROOM = 0.8
+AA_SPRITE_CACHE_SIZE = 1024
+OVERLAY_CACHE_SIZE = 4
 
 GAME_HELP_TEXT = (
     "按下方向键或WASD键移动。\n食物有四种：\n灰色无特殊效果，红色可加快速度，蓝色可减慢速度，金色可得到双倍分数。\n按下ESC退出帮助页面。"
 )
 
-SNAKE_INITIAL_LENGTH = 3
\ No newline at end of file
+SNAKE_INITIAL_LENGTH = 3
+FOOD_SPAWN_ATTEMPTS = 64
+AUTOPILOT_BUDGET_US = 1000
+# Search steps per frame of the autopilot in headless games, about as many
+# as fit in AUTOPILOT_BUDGET_US.
+AUTOPILOT_NODE_BUDGET = 100
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7777
+SERVER_TICK_RATE = 30
+SERVER_RESTART_DELAY = 2.0
+SERVER_MAX_WRITE_BUFFER = 256 * 1024
+SERVER_STATS_INTERVAL = 5.0
+ARENA_WIDTH = 200
+ARENA_HEIGHT = 200
+ARENA_BOTS = 100
+ARENA_FOODS_PER_SNAKE = 2
+ARENA_HEAD_CELL_SIZE = 8
\ No newline at end of file
@@ -0,0 +1,31 @@
+import time
+import pygame
+import game
+import inputs
+
+KEY_ORIENTATIONS = {
+    pygame.K_UP: game.SnakeOrientation.UP,
+    pygame.K_w: game.SnakeOrientation.UP,
+    pygame.K_LEFT: game.SnakeOrientation.LEFT,
+    pygame.K_a: game.SnakeOrientation.LEFT,
+    pygame.K_DOWN: game.SnakeOrientation.DOWN,
+    pygame.K_s: game.SnakeOrientation.DOWN,
+    pygame.K_RIGHT: game.SnakeOrientation.RIGHT,
+    pygame.K_d: game.SnakeOrientation.RIGHT,
+}
+FRAME_HUD_KEY = pygame.K_F3
+RENDER_SCALE_KEY = pygame.K_F5
+SSAA_KEY = pygame.K_F6
+DYNAMIC_RESOLUTION_KEY = pygame.K_F7
+
+
+def handle_game_event(
+    manager: game.GameManager, queue: inputs.InputQueue, event: pygame.event.Event
+) -> None:
+    """Queue the turn a direction key asks for at the time it was pressed."""
+    if manager.end == 0 and event.type == pygame.KEYDOWN:
+        orientation = KEY_ORIENTATIONS.get(event.key)
+        if orientation is not None:
+            # FramePacer stamps the events it hands out.
+            timestamp = getattr(event, "timestamp", None) or time.perf_counter()
+            queue.push(orientation, timestamp)
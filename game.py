@@ -1,10 +1,16 @@
+import copy
 import math
 import random
+from collections import deque
 from enum import Enum
-from typing import Hashable, Protocol
-import pygame
+from itertools import islice
+from statistics import NormalDist
+from typing import Hashable, Iterator, NamedTuple, Optional, Protocol
 import config
 
+# Draws from a whole row before FoodSpawner.sample_x weighs its free cells.
+COLUMN_ATTEMPTS = 8
+
 
 class FoodType(Enum):
     NORMAL = 0
@@ -31,30 +37,211 @@ class GamePoint(Protocol):
     y: float
 
 
+class FoodSpawn(Enum):
+    SPAWNED = 0
+    RETRY = 1
+    BOARD_FULL = 2
+
+
 class Food:
-    def __init__(self, xmin: float, xmax: float, ymin: float, ymax: float) -> None:
-        xmu = (xmin + xmax) / 2
-        xvar = (xmax - xmin) / 4
-        self.x = random.normalvariate(xmu, xvar)
-        while not xmin < self.x < xmax:
-            self.x = random.normalvariate(xmu, xvar)
-
-        ymu = (ymin + ymax) / 2
-        yvar = (ymax - ymin) / 4
-        self.y = random.normalvariate(ymu, yvar)
-        while not ymin < self.y < ymax:
-            self.y = random.normalvariate(ymu, yvar)
-
-        if random.randrange(10) < 7:
-            self.type = FoodType.NORMAL
-        else:
-            self.type = random.choice(list(FoodType))
+    __slots__ = ("x", "y", "type")
+
+    def __init__(self, x: float, y: float, type: FoodType) -> None:
+        self.x = x
+        self.y = y
+        self.type = type
 
     def is_close_to(self, pos: GamePoint) -> bool:
         return (pos.x - self.x) ** 2 + (pos.y - self.y) ** 2 < 1
 
 
+def get_cell_masses(dist: NormalDist, low: float, high: float) -> dict[int, float]:
+    return {
+        i: dist.cdf(min(i + 1, high)) - dist.cdf(max(i, low))
+        for i in range(math.floor(low), math.ceil(high))
+    }
+
+
+class FoodSpawner:
+    """Draws food positions from the unit cells the snake body does not cover.
+
+    Cells are weighted by the mass a normal distribution centred on the board
+    puts on them, and positions inside a cell follow the same distribution,
+    so accepted foods are distributed like rejection sampling over the whole
+    board would give, without spinning when most of the board is taken.
+    """
+
+    def __init__(
+        self, xmin: float, xmax: float, ymin: float, ymax: float, rng: random.Random
+    ) -> None:
+        self.xmin = xmin
+        self.xmax = xmax
+        self.ymin = ymin
+        self.ymax = ymax
+        self.random = rng
+        self.x_dist = NormalDist((xmin + xmax) / 2, (xmax - xmin) / 4)
+        self.y_dist = NormalDist((ymin + ymax) / 2, (ymax - ymin) / 4)
+        self.x_masses = get_cell_masses(self.x_dist, xmin, xmax)
+        self.y_masses = get_cell_masses(self.y_dist, ymin, ymax)
+
+    def sample_in_cell(
+        self, dist: NormalDist, cell: int, low: float, high: float
+    ) -> float:
+        a = dist.cdf(max(cell, low))
+        b = dist.cdf(min(cell + 1, high))
+        value = dist.inv_cdf(self.random.uniform(a, b))
+        while not low < value < high:
+            value = dist.inv_cdf(self.random.uniform(a, b))
+        return value
+
+    def choose(self, weights: dict[int, float]) -> int:
+        target = self.random.random() * sum(weights.values())
+        for i, weight in weights.items():
+            target -= weight
+            if target < 0:
+                return i
+        return max(k for k, v in weights.items() if v > 0)
+
+    def get_free_mass(self, covered: dict[tuple[int, int], int]) -> "FreeMass":
+        free_mass = FreeMass(self.x_masses, self.y_masses)
+        for cell in covered:
+            free_mass.update(cell, 1)
+        return free_mass
+
+    def sample_x(self, row: int, covered: dict[tuple[int, int], int]) -> float:
+        """Draw x from the free cells of the row, by drawing from the whole
+        row until the cell is free, or, in a row that is nearly full, from
+        the free cells directly."""
+        a = self.x_dist.cdf(self.xmin)
+        b = self.x_dist.cdf(self.xmax)
+        for _ in range(COLUMN_ATTEMPTS):
+            x = self.x_dist.inv_cdf(self.random.uniform(a, b))
+            if self.xmin < x < self.xmax and (math.floor(x), row) not in covered:
+                return x
+        i = self.choose(
+            {i: v for i, v in self.x_masses.items() if (i, row) not in covered}
+        )
+        return self.sample_in_cell(self.x_dist, i, self.xmin, self.xmax)
+
+    def positions(self, grid: "SegmentGrid") -> Optional[Iterator[tuple[float, float]]]:
+        """Return an endless stream of candidate positions, or None if the body
+        covers every cell of the board. The first call gives the grid a free
+        mass to keep up to date."""
+        if grid.free_mass is None:
+            grid.free_mass = self.get_free_mass(grid.covered)
+        free_mass = grid.free_mass
+        if free_mass.is_full():
+            return None
+
+        def generate() -> Iterator[tuple[float, float]]:
+            while True:
+                j = free_mass.choose_row(self.random.random())
+                x = self.sample_x(j, grid.covered)
+                y = self.sample_in_cell(self.y_dist, j, self.ymin, self.ymax)
+                yield x, y
+
+        return generate()
+
+    def random_type(self) -> FoodType:
+        if self.random.randrange(10) < 7:
+            return FoodType.NORMAL
+        return self.random.choice(list(FoodType))
+
+
+class FreeMass:
+    """The mass of the cells of a board a SegmentGrid does not cover, kept up
+    to date by the grid as it covers and uncovers cells.
+
+    Rows are weighted by their mass times the mass of their free cells, in a
+    Fenwick tree, so FoodSpawner draws a row in O(log rows) instead of
+    weighing the whole board for every food.
+    """
+
+    def __init__(self, x_masses: dict[int, float], y_masses: dict[int, float]) -> None:
+        self.x_masses = x_masses
+        self.y_masses = y_masses
+        self.x_mass = sum(x_masses.values())
+        self.y_low = min(y_masses)
+        self.covered_counts: dict[int, int] = {}
+        self.covered_masses: dict[int, float] = {}
+        self.full_rows = 0
+        # tree[k] sums the weights of rows k - (k & -k) .. k - 1.
+        tree = [0.0] + [y_masses[j] * self.x_mass for j in sorted(y_masses)]
+        for k in range(1, len(tree)):
+            parent = k + (k & -k)
+            if parent < len(tree):
+                tree[parent] += tree[k]
+        self.tree = tree
+
+    def clone(self) -> "FreeMass":
+        free_mass = copy.copy(self)
+        free_mass.covered_counts = self.covered_counts.copy()
+        free_mass.covered_masses = self.covered_masses.copy()
+        free_mass.tree = self.tree.copy()
+        return free_mass
+
+    def is_full(self) -> bool:
+        return self.full_rows == len(self.y_masses)
+
+    def is_row_full(self, row: int) -> bool:
+        return self.covered_counts.get(row, 0) == len(self.x_masses)
+
+    def get_weight(self, row: int) -> float:
+        if self.is_row_full(row):
+            return 0.0
+        free = self.x_mass - self.covered_masses.get(row, 0.0)
+        return self.y_masses[row] * max(0.0, free)
+
+    def update(self, cell: tuple[int, int], delta: int) -> None:
+        """Record that the cell was covered (delta 1) or uncovered (-1)."""
+        i, j = cell
+        if i not in self.x_masses or j not in self.y_masses:
+            return
+        before = self.get_weight(j)
+        self.full_rows -= self.is_row_full(j)
+        count = self.covered_counts.get(j, 0) + delta
+        if count:
+            self.covered_counts[j] = count
+            self.covered_masses[j] = (
+                self.covered_masses.get(j, 0.0) + delta * self.x_masses[i]
+            )
+        else:
+            # Also drops the rounding errors of the sums.
+            del self.covered_counts[j]
+            del self.covered_masses[j]
+        self.full_rows += self.is_row_full(j)
+        change = self.get_weight(j) - before
+        k = j - self.y_low + 1
+        while k < len(self.tree):
+            self.tree[k] += change
+            k += k & -k
+
+    def choose_row(self, u: float) -> int:
+        """Return the row at fraction ``u`` of the total weight."""
+        tree = self.tree
+        total = 0.0
+        k = len(tree) - 1
+        while k:
+            total += tree[k]
+            k -= k & -k
+        target = u * total
+        k = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if k + step < len(tree) and tree[k + step] <= target:
+                k += step
+                target -= tree[k]
+            step >>= 1
+        row = self.y_low + min(k, len(tree) - 2)
+        if self.is_row_full(row):
+            # Only rounding errors of the tree lead here.
+            row = next(j for j in self.y_masses if not self.is_row_full(j))
+        return row
+
+
 class SnakeKeyPoint:
+    __slots__ = ("x", "y", "orientation")
+
     def __init__(self, x: float, y: float, orientation: SnakeOrientation) -> None:
         self.x = x
         self.y = y
@@ -63,6 +250,145 @@ class SnakeKeyPoint:
     def distance(self, pos: GamePoint) -> float:
         return math.sqrt((self.x - pos.x) ** 2 + (self.y - pos.y) ** 2)
 
+    def copy(self) -> "SnakeKeyPoint":
+        return SnakeKeyPoint(self.x, self.y, self.orientation)
+
+
+def is_close_to_segment(k1: GamePoint, k2: GamePoint, pos: GamePoint) -> bool:
+    if math.sqrt((k2.x - pos.x) ** 2 + (k2.y - pos.y) ** 2) < 1:
+        return True
+    if k1.x == k2.x:
+        return min(k1.y, k2.y) < pos.y < max(k1.y, k2.y) and abs(k1.x - pos.x) < 1
+    return min(k1.x, k2.x) < pos.x < max(k1.x, k2.x) and abs(k1.y - pos.y) < 1
+
+
+def get_covered_cells(k1: GamePoint, k2: GamePoint) -> tuple[bool, int, range]:
+    """Return the unit cells every point of which is close to the segment, as
+    whether the segment is vertical, its row or column and the covered span."""
+    if k1.x == k2.x:
+        lo, hi = min(k1.y, k2.y), max(k1.y, k2.y)
+        return True, math.floor(k1.x), range(math.floor(lo) + 1, math.floor(hi))
+    lo, hi = min(k1.x, k2.x), max(k1.x, k2.x)
+    return False, math.floor(k1.y), range(math.floor(lo) + 1, math.floor(hi))
+
+
+class SegmentGrid:
+    """Uniform grid of body segments, indexed by every cell within one unit.
+
+    A point can only be close to the segments registered in its own cell.
+    Segments are stored by their key point nearer to the head, and the cells
+    hold frozensets so clone only has to copy the dicts.
+    ``covered`` counts, per cell, the segments that cover the whole cell.
+    Grids that share an ``owners`` index keep their ``owner`` in its set for
+    every cell they have segments in, so many snakes can share a broad phase.
+    """
+
+    def __init__(
+        self,
+        owner: Hashable = None,
+        owners: Optional[dict[tuple[int, int], set]] = None,
+    ) -> None:
+        self.owner = owner
+        self.owners = owners
+        self.cells: dict[tuple[int, int], frozenset[SnakeKeyPoint]] = {}
+        self.segments: dict[
+            SnakeKeyPoint,
+            tuple[SnakeKeyPoint, tuple[tuple[int, int], ...], tuple[bool, int, range]],
+        ] = {}
+        self.covered: dict[tuple[int, int], int] = {}
+        self.free_mass: Optional[FreeMass] = None
+
+    def clone(self) -> "SegmentGrid":
+        # Clones stay out of any shared owners index.
+        grid = SegmentGrid()
+        grid.cells = self.cells.copy()
+        grid.segments = self.segments.copy()
+        grid.covered = self.covered.copy()
+        if self.free_mass is not None:
+            grid.free_mass = self.free_mass.clone()
+        return grid
+
+    def cover(self, covered: tuple[bool, int, range], delta: int) -> None:
+        vertical, fixed, span = covered
+        for v in span:
+            cell = (fixed, v) if vertical else (v, fixed)
+            count = self.covered.get(cell, 0) + delta
+            if count:
+                self.covered[cell] = count
+            else:
+                del self.covered[cell]
+            # Only when the cell becomes covered or free.
+            if self.free_mass is not None and count in (0, delta):
+                self.free_mass.update(cell, delta)
+
+    def add(self, k1: SnakeKeyPoint, k2: SnakeKeyPoint) -> None:
+        cells = tuple(
+            (x, y)
+            for x in range(
+                math.floor(min(k1.x, k2.x) - 1), math.floor(max(k1.x, k2.x) + 1) + 1
+            )
+            for y in range(
+                math.floor(min(k1.y, k2.y) - 1), math.floor(max(k1.y, k2.y) + 1) + 1
+            )
+        )
+        added = frozenset([k1])
+        for cell in cells:
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                self.cells[cell] = added
+                if self.owners is not None:
+                    self.owners.setdefault(cell, set()).add(self.owner)
+            else:
+                self.cells[cell] = bucket | added
+        covered = get_covered_cells(k1, k2)
+        self.cover(covered, 1)
+        self.segments[k1] = (k2, cells, covered)
+
+    def remove(self, k1: SnakeKeyPoint) -> None:
+        if k1 not in self.segments:
+            return
+        _, cells, covered = self.segments.pop(k1)
+        removed = frozenset([k1])
+        for cell in cells:
+            bucket = self.cells[cell] - removed
+            if bucket:
+                self.cells[cell] = bucket
+            else:
+                del self.cells[cell]
+                if self.owners is not None:
+                    owners = self.owners[cell]
+                    owners.discard(self.owner)
+                    if not owners:
+                        del self.owners[cell]
+        self.cover(covered, -1)
+
+    def clear(self) -> None:
+        for k1 in list(self.segments):
+            self.remove(k1)
+
+    def shrink(self, k1: SnakeKeyPoint) -> None:
+        """Refresh the covered cells after the far end of the segment moved
+        towards ``k1``. The query cells are left as they are."""
+        if k1 not in self.segments:
+            return
+        k2, cells, covered = self.segments[k1]
+        new_covered = get_covered_cells(k1, k2)
+        if len(new_covered[2]) != len(covered[2]):
+            self.cover(covered, -1)
+            self.cover(new_covered, 1)
+            self.segments[k1] = (k2, cells, new_covered)
+
+    def replace_end(self, k1: SnakeKeyPoint, k2: SnakeKeyPoint) -> None:
+        """Point the segment starting at ``k1`` to a copy of its far end."""
+        if k1 in self.segments:
+            _, cells, covered = self.segments[k1]
+            self.segments[k1] = (k2, cells, covered)
+
+    def query(self, pos: GamePoint) -> Iterator[tuple[SnakeKeyPoint, SnakeKeyPoint]]:
+        segments = self.segments
+        for k1 in self.cells.get((math.floor(pos.x), math.floor(pos.y)), ()):
+            yield k1, segments[k1][0]
+
 
 class Snake:
     def move(self, time: float) -> None:
@@ -76,23 +402,33 @@ class Snake:
         next.x += step_size * xmove[next.orientation.value]
         next.y += step_size * ymove[next.orientation.value]
 
-        length_sum = 0
-        for i, j in zip(self.key_points[1:], self.key_points[:-1]):
-            length_sum += i.distance(j)
+        # The head only ever moves away from the previous key point, so the
+        # body grows by exactly one step before the tail is trimmed.
+        if len(self.key_points) >= 2:
+            self.length_sum += step_size
 
-        if length_sum > self.length:
+        if self.length_sum > self.length:
             while len(self.key_points) >= 2:
                 last = self.key_points[-1]
                 before = self.key_points[-2]
                 last_length = last.distance(before)
-                surplus = length_sum - self.length
+                surplus = self.length_sum - self.length
                 if last_length > surplus:
                     last.x -= (last.x - before.x) / last_length * surplus
                     last.y -= (last.y - before.y) / last_length * surplus
+                    self.length_sum = float(self.length)
+                    self.segment_grid.shrink(before)
                     break
                 else:
-                    length_sum -= last_length
+                    self.length_sum -= last_length
+                    self.segment_grid.remove(before)
                     self.key_points.pop()
+                    # The new tail will be trimmed in place, and a clone may
+                    # share it as a body key point.
+                    if len(self.key_points) >= 2:
+                        tail = before.copy()
+                        self.key_points[-1] = tail
+                        self.segment_grid.replace_end(self.key_points[-2], tail)
 
     def eat(self, food: Food) -> None:
         self.length += 1
@@ -106,8 +442,16 @@ class Snake:
             self.state_time = 50 / self.get_speed()
 
     def is_close_to_body(self, pos: GamePoint) -> bool:
+        # Only the segments within one unit of the head need the walk from the
+        # head; every other segment is looked up in the grid.
         length_sum = 0
-        for k1, k2 in zip(self.key_points[:-1], self.key_points[1:]):
+        near_head = []
+        for i in range(len(self.key_points) - 1):
+            if length_sum >= 1:
+                break
+            k1 = self.key_points[i]
+            k2 = self.key_points[i + 1]
+            near_head.append(k1)
             last_sum = length_sum
             length_sum += k1.distance(k2)
             if length_sum < 1:
@@ -120,28 +464,34 @@ class Snake:
                     k1.y + ychange[k1.orientation.value] * (1 - last_sum),
                     k1.orientation,
                 )
-            if k2.distance(pos) < 1:
+            if is_close_to_segment(k1, k2, pos):
+                return True
+        for k1, k2 in self.segment_grid.query(pos):
+            if k1 not in near_head and is_close_to_segment(k1, k2, pos):
                 return True
-            if k1.x == k2.x:
-                if min(k1.y, k2.y) < pos.y < max(k1.y, k2.y):
-                    if abs(k1.x - pos.x) < 1:
-                        return True
-            else:
-                if min(k1.x, k2.x) < pos.x < max(k1.x, k2.x):
-                    if abs(k1.y - pos.y) < 1:
-                        return True
         return False
 
+    def is_turn(self, orientation: SnakeOrientation) -> bool:
+        """Whether the orientation turns the head, rather than keeping or
+        reversing its direction."""
+        if len(self.key_points) < 2:
+            return True
+        front = self.key_points[0].orientation
+        return orientation != front and front.value + orientation.value != 3
+
+    def is_turn_ready(self) -> bool:
+        """Whether the head is far enough from the last turn to turn again."""
+        if len(self.key_points) < 2:
+            return True
+        return self.key_points[0].distance(self.key_points[1]) > 1
+
     def set_orientation(self, orientation: SnakeOrientation) -> None:
         front = self.key_points[0]
         if len(self.key_points) >= 2:
-            if orientation == front.orientation:
-                return
-            if front.distance(self.key_points[1]) <= 1:
+            if not self.is_turn(orientation) or not self.is_turn_ready():
                 return
-            if front.orientation.value + orientation.value == 3:
-                return
-        self.key_points.insert(0, SnakeKeyPoint(front.x, front.y, orientation))
+            self.segment_grid.add(front, self.key_points[1])
+        self.key_points.appendleft(SnakeKeyPoint(front.x, front.y, orientation))
 
     def get_speed(self) -> float:
         speed = (self.length + 5) / 2
@@ -151,17 +501,56 @@ class Snake:
             speed /= 2
         return speed
 
+    def clone(self) -> "Snake":
+        """Copy the snake, sharing every key point except the head and tail,
+        which are the only ones moved in place."""
+        snake = Snake()
+        snake.length = self.length
+        snake.length_sum = self.length_sum
+        snake.state = self.state
+        snake.state_time = self.state_time
+        snake.key_points = deque(self.key_points)
+        snake.segment_grid = self.segment_grid.clone()
+        snake.key_points[0] = self.key_points[0].copy()
+        if len(snake.key_points) >= 2:
+            tail = self.key_points[-1].copy()
+            snake.key_points[-1] = tail
+            snake.segment_grid.replace_end(snake.key_points[-2], tail)
+        return snake
+
     def reset(self, x: float, y: float) -> None:
         self.length = config.SNAKE_INITIAL_LENGTH
-        self.key_points = [SnakeKeyPoint(x, y, SnakeOrientation.LEFT)]
+        self.key_points = deque([SnakeKeyPoint(x, y, SnakeOrientation.LEFT)])
+        self.length_sum = 0.0
         self.state = SnakeState.NORMAL
         self.state_time = 0.0
+        self.segment_grid = SegmentGrid()
+
+
+def new_random(state: tuple) -> random.Random:
+    """Return a Random in the given state of Random.getstate."""
+    # Random() would first seed itself from the OS, which is slower than
+    # setting the state.
+    rng = random.Random.__new__(random.Random)
+    rng.setstate(state)
+    return rng
+
+
+class GameSnapshot(NamedTuple):
+    random_state: tuple
+    snake: Snake
+    foods: tuple[Food, ...]
+    end: int
+    playing: bool
+    food_time: float
 
 
 class GameManager:
-    def __init__(self, width: int, height: int) -> None:
+    def __init__(self, width: int, height: int, seed: Optional[int] = None) -> None:
         self.width = width
         self.height = height
+        self.random = random.Random(seed)
+        self.food_spawner = FoodSpawner(0, width - 1, 0, height - 1, self.random)
         self.snake = Snake()
         self.foods = []
         self.reset_game()
@@ -189,10 +578,12 @@ class GameManager:
         if len(foods) >= 3:
             self.food_time = max(self.width, self.height) / self.snake.get_speed() / 4
         if self.food_time > max(self.width, self.height) / self.snake.get_speed() / 2:
-            self.create_new_food()
-            self.food_time = 0
+            if self.create_new_food() != FoodSpawn.RETRY:
+                self.food_time = 0
 
-    def reset_game(self) -> None:
+    def reset_game(self, seed: Optional[int] = None) -> None:
+        if seed is not None:
+            self.random.seed(seed)
         self.end = 0
         self.playing = False
         self.snake.reset(self.width / 2, self.height / 2)
@@ -204,33 +595,58 @@ class GameManager:
             self.playing = True
             self.snake.set_orientation(orientation)
 
-    def create_new_food(self) -> None:
-        satisfy = False
-        while not satisfy:
-            new_food = Food(0, self.width - 1, 0, self.height - 1)
-            satisfy = True
-            if self.snake.is_close_to_body(new_food):
-                satisfy = False
-            for food in self.foods:
-                if new_food.is_close_to(food):
-                    satisfy = False
-                    break
-            head = self.snake.key_points[0]
-            if new_food.is_close_to(head):
-                satisfy = False
-        self.foods.append(new_food)
+    def create_new_food(self) -> FoodSpawn:
+        """Try a bounded number of positions; RETRY means none of them was free
+        this time, BOARD_FULL that the body covers every cell."""
+        positions = self.food_spawner.positions(self.snake.segment_grid)
+        if positions is None:
+            return FoodSpawn.BOARD_FULL
+        head = self.snake.key_points[0]
+        for x, y in islice(positions, config.FOOD_SPAWN_ATTEMPTS):
+            new_food = Food(x, y, self.food_spawner.random_type())
+            if self.snake.is_close_to_body(new_food) or new_food.is_close_to(head):
+                continue
+            if any(new_food.is_close_to(food) for food in self.foods):
+                continue
+            self.foods.append(new_food)
+            return FoodSpawn.SPAWNED
+        return FoodSpawn.RETRY
 
     def get_score(self) -> int:
         return self.snake.length - config.SNAKE_INITIAL_LENGTH
 
-    def handle_event(self, event: pygame.event.Event) -> None:
-        if self.end == 0:
-            if event.type == pygame.KEYDOWN:
-                if event.key in [pygame.K_UP, pygame.K_w]:
-                    self.set_snake_orientation(SnakeOrientation.UP)
-                elif event.key in [pygame.K_LEFT, pygame.K_a]:
-                    self.set_snake_orientation(SnakeOrientation.LEFT)
-                elif event.key in [pygame.K_DOWN, pygame.K_s]:
-                    self.set_snake_orientation(SnakeOrientation.DOWN)
-                elif event.key in [pygame.K_RIGHT, pygame.K_d]:
-                    self.set_snake_orientation(SnakeOrientation.RIGHT)
+    def clone(self) -> "GameManager":
+        """Return an independent copy of the game, e.g. for lookahead search."""
+        manager = GameManager.__new__(GameManager)
+        manager.width = self.width
+        manager.height = self.height
+        manager.random = new_random(self.random.getstate())
+        manager.food_spawner = copy.copy(self.food_spawner)
+        manager.food_spawner.random = manager.random
+        manager.snake = self.snake.clone()
+        manager.foods = self.foods.copy()
+        manager.end = self.end
+        manager.playing = self.playing
+        manager.food_time = self.food_time
+        return manager
+
+    def snapshot(self) -> GameSnapshot:
+        """Return the state to pass to restore later, any number of times."""
+        return GameSnapshot(
+            self.random.getstate(),
+            self.snake.clone(),
+            tuple(self.foods),
+            self.end,
+            self.playing,
+            self.food_time,
+        )
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        """Return to the state of a snapshot of this game. Foods are never
+        modified, so they are shared."""
+        self.random.setstate(snapshot.random_state)
+        self.snake = snapshot.snake.clone()
+        self.foods = list(snapshot.foods)
+        self.end = snapshot.end
+        self.playing = snapshot.playing
+        self.food_time = snapshot.food_time
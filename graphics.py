@@ -1,9 +1,14 @@
 import math
-from typing import Optional
+from fractions import Fraction
+from itertools import islice, zip_longest
+from typing import Iterable, Optional, Union
 import pygame
+import arena
 import config
+from cache import LRUCache
 import game
 import menu
+import text
 
 COLOR_BLACK = pygame.Color("black")
 COLOR_BLUE = pygame.Color("blue")
@@ -21,8 +26,24 @@ FOOD_COLOR = {
     game.FoodType.SLOWDOWN: COLOR_BLUE,
     game.FoodType.SPEEDUP: COLOR_RED,
 }
+BOT_HEAD_COLOR = COLOR_DARK_RED
 SELECTED_COLOR = COLOR_CYAN
 UNSELECT_COLOR = COLOR_GRAY
+END_OVERLAY_COLOR = pygame.Color(255, 255, 255, 128)
+HELP_OVERLAY_COLORS = [pygame.Color(0, 255, 255, 180), pygame.Color(255, 255, 255, 230)]
+
+aa_sprite_cache: LRUCache[pygame.Surface] = LRUCache(config.AA_SPRITE_CACHE_SIZE)
+overlay_cache: LRUCache[pygame.Surface] = LRUCache(config.OVERLAY_CACHE_SIZE)
+snake_layer = pygame.Surface((0, 0), pygame.SRCALPHA)
+
+
+def get_ssaa() -> int:
+    return config.SSAA
+
+
+def set_ssaa(ssaa: int) -> None:
+    """Sprites are cached per level, so switching back and forth is cheap."""
+    config.SSAA = ssaa
 
 
 def fill_rectangle(
@@ -30,9 +51,72 @@ def fill_rectangle(
 ) -> None:
     if rect == None:
         rect = surface.get_rect()
-    rect_surface = pygame.Surface(rect.size, pygame.SRCALPHA)
-    rect_surface.fill(color)
-    surface.blit(rect_surface, rect.topleft)
+    surface.blit(get_overlay(rect.size, color), rect.topleft)
+
+
+def get_overlay(size: tuple[int, int], color: pygame.Color) -> pygame.Surface:
+    def create() -> pygame.Surface:
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill(color)
+        return overlay
+
+    return overlay_cache.get((tuple(size), tuple(color)), create)
+
+
+def render_aarectangle(
+    color: tuple[int, int, int, int], x: int, y: int, w: int, h: int, ssaa: int
+) -> pygame.Surface:
+    width = math.ceil((x + w) / ssaa)
+    height = math.ceil((y + h) / ssaa)
+    aasurface = pygame.Surface((ssaa * width, ssaa * height), pygame.SRCALPHA)
+    aasurface.fill((*color[:3], 0))
+    pygame.draw.rect(aasurface, color, (x, y, w, h))
+    return pygame.transform.smoothscale(aasurface, (width, height))
+
+
+def render_aacircle(
+    color: tuple[int, int, int, int], r: float, x: int, y: int, ssaa: int
+) -> pygame.Surface:
+    width = math.ceil(x / ssaa + 2 * r)
+    height = math.ceil(y / ssaa + 2 * r)
+    aar = ssaa * r
+    aasurface = pygame.Surface((ssaa * width, ssaa * height), pygame.SRCALPHA)
+    aasurface.fill((*color[:3], 0))
+    pygame.draw.circle(aasurface, color, (aar + x, aar + y), aar)
+    return pygame.transform.smoothscale(aasurface, (width, height))
+
+
+def get_aacircle(color: pygame.Color, x: float, y: float, r: float) -> pygame.Surface:
+    rx_floor = math.floor(x - r)
+    ry_floor = math.floor(y - r)
+    key = (
+        tuple(color),
+        r,
+        round(config.SSAA * (x - r - rx_floor)),
+        round(config.SSAA * (y - r - ry_floor)),
+        config.SSAA,
+    )
+    return aa_sprite_cache.get(key, lambda: render_aacircle(*key))
+
+
+def get_aarectangle(
+    color: pygame.Color, x1: float, y1: float, x2: float, y2: float
+) -> pygame.Surface:
+    x1f = math.floor(x1)
+    y1f = math.floor(y1)
+    x = round(config.SSAA * (x1 - x1f))
+    y = round(config.SSAA * (y1 - y1f))
+    # Both edges are rounded, so an edge that stays put keeps its pixels
+    # while the other one moves.
+    key = (
+        tuple(color),
+        x,
+        y,
+        round(config.SSAA * (x2 - x1f)) - x,
+        round(config.SSAA * (y2 - y1f)) - y,
+        config.SSAA,
+    )
+    return aa_sprite_cache.get(key, lambda: render_aarectangle(*key))
 
 
 def fill_aarectangle(
@@ -43,109 +127,183 @@ def fill_aarectangle(
     x2: float,
     y2: float,
 ) -> None:
-    x1f = math.floor(x1)
-    y1f = math.floor(y1)
-    width = math.ceil(x2) - x1f
-    height = math.ceil(y2) - y1f
-    x = max(0, x1f)
-    y = max(0, y1f)
-    w = width if x + width < surface.get_width() else width - 1
-    h = height if y + height < surface.get_height() else height - 1
-    aasurface = pygame.Surface((width, height), pygame.SRCALPHA)
-    aasurface.blit(surface.subsurface((x, y, w, h)), (x1f - x, y1f - y))
-    aasurface = pygame.transform.scale(
-        aasurface, (config.SSAA * width, config.SSAA * height)
-    )
-    pygame.draw.rect(
-        aasurface,
-        color,
-        (
-            round(config.SSAA * (x1 - math.floor(x1))),
-            round(config.SSAA * (y1 - math.floor(y1))),
-            round(config.SSAA * (x2 - x1)),
-            round(config.SSAA * (y2 - y1)),
-        ),
-    )
-    aasurface = pygame.transform.smoothscale(aasurface, (width, height))
-    surface.blit(aasurface, (math.floor(x1), math.floor(y1)))
+    sprite = get_aarectangle(color, x1, y1, x2, y2)
+    surface.blit(sprite, (math.floor(x1), math.floor(y1)))
 
 
 def fill_aacircle(
     surface: pygame.Surface, color: pygame.Color, x: float, y: float, r: float
 ) -> None:
-    rx_floor = math.floor(x - r)
-    ry_floor = math.floor(y - r)
-    width = math.ceil(x + r) - rx_floor
-    height = math.ceil(y + r) - ry_floor
-    aar = config.SSAA * r
-    aax = aar + round(config.SSAA * (x - r - rx_floor))
-    aay = aar + round(config.SSAA * (y - r - ry_floor))
-    sub_x = max(rx_floor, 0)
-    sub_y = max(ry_floor, 0)
-    sub_w = width if sub_x + width < surface.get_width() else width - 1
-    sub_h = height if sub_y + height < surface.get_height() else height - 1
-    aasurface = pygame.Surface((width, height), pygame.SRCALPHA)
-    aasurface.blit(
-        surface.subsurface((sub_x, sub_y, sub_w, sub_h)),
-        (sub_x - rx_floor, sub_y - ry_floor),
-    )
-    aasurface = pygame.transform.scale(
-        aasurface, (config.SSAA * width, config.SSAA * height)
-    )
-    pygame.draw.circle(aasurface, color, (aax, aay), aar)
-    aasurface = pygame.transform.smoothscale(aasurface, (width, height))
-    surface.blit(aasurface, (rx_floor, ry_floor))
-
-
-def draw_snake(surface: pygame.Surface, snake: game.Snake) -> None:
-    for k1, k2 in zip(snake.key_points[:-1], snake.key_points[1:]):
-        o = k1.orientation
-        fill_aacircle(
-            surface,
-            COLOR_DIM_GRAY,
-            (k2.x + 0.5) * config.SNAKE_SIZE,
-            (k2.y + 0.5) * config.SNAKE_SIZE,
-            config.SNAKE_SIZE / 2,
+    sprite = get_aacircle(color, x, y, r)
+    surface.blit(sprite, (math.floor(x - r), math.floor(y - r)))
+
+
+def get_snake_layer(width: int, height: int) -> pygame.Surface:
+    global snake_layer
+    if snake_layer.get_width() < width or snake_layer.get_height() < height:
+        snake_layer = pygame.Surface(
+            (
+                max(width, snake_layer.get_width()),
+                max(height, snake_layer.get_height()),
+            ),
+            pygame.SRCALPHA,
         )
-        if k1.x > k2.x or k1.y > k2.y:
-            k1, k2 = k2, k1
-        rx1 = k1.x * config.SNAKE_SIZE
-        rx2 = k2.x * config.SNAKE_SIZE + config.SNAKE_SIZE
-        ry1 = k1.y * config.SNAKE_SIZE
-        ry2 = k2.y * config.SNAKE_SIZE + config.SNAKE_SIZE
-        if o in [game.SnakeOrientation.DOWN, game.SnakeOrientation.UP]:
-            ry1 += config.SNAKE_SIZE / 2
-            ry2 -= config.SNAKE_SIZE / 2
-        if o in [game.SnakeOrientation.LEFT, game.SnakeOrientation.RIGHT]:
-            rx1 += config.SNAKE_SIZE / 2
-            rx2 -= config.SNAKE_SIZE / 2
-        fill_aarectangle(surface, COLOR_DIM_GRAY, rx1, ry1, rx2, ry2)
-
-    head = snake.key_points[0]
-    fill_aacircle(
-        surface,
-        COLOR_BLACK,
-        (head.x + 0.5) * config.SNAKE_SIZE,
-        (head.y + 0.5) * config.SNAKE_SIZE,
-        config.SNAKE_SIZE / 2,
+    return snake_layer.subsurface((0, 0, width, height))
+
+
+def get_cells_rect(
+    x1: float, y1: float, x2: float, y2: float, size: float = config.SNAKE_SIZE
+) -> pygame.Rect:
+    left = math.floor(min(x1, x2) * size) - 1
+    top = math.floor(min(y1, y2) * size) - 1
+    return pygame.Rect(
+        left,
+        top,
+        math.ceil((max(x1, x2) + 1) * size) + 1 - left,
+        math.ceil((max(y1, y2) + 1) * size) + 1 - top,
     )
 
 
-def draw_foods(surface: pygame.Surface, foods: list[game.Food]) -> None:
+class Camera:
+    """The part of the board shown on the screen, in board pixels.
+
+    It moves in whole pixels, so sprites keep their sub-pixel cache keys.
+    """
+
+    def __init__(
+        self, width: int = config.WINDOW_WIDTH, height: int = config.WINDOW_HEIGHT
+    ) -> None:
+        self.rect = pygame.Rect(0, 0, width, height)
+
+    def follow(self, x: float, y: float, board_width: int, board_height: int) -> None:
+        """Centre the cell at x, y, without showing anything beyond the board."""
+        size = config.SNAKE_SIZE
+        self.rect.center = (round((x + 0.5) * size), round((y + 0.5) * size))
+        self.rect.clamp_ip(pygame.Rect(0, 0, board_width * size, board_height * size))
+
+
+def get_offset(camera: Optional[Camera], scale: float = 1) -> tuple[int, int]:
+    if not camera:
+        return 0, 0
+    return round(camera.rect.x * scale), round(camera.rect.y * scale)
+
+
+def get_visible_segments(
+    snake: game.Snake, view: pygame.Rect, size: float = config.SNAKE_SIZE
+) -> list[tuple[game.SnakeKeyPoint, game.SnakeKeyPoint]]:
+    """Return the segments that may reach the view, in board pixels.
+
+    Unless the snake is short for the size of the view, the segments are
+    looked up in the snake's SegmentGrid instead of walking the whole body.
+    Segments touching interpolated key points come from the render snake's
+    views.
+    """
+    key_points = snake.key_points
+    if len(key_points) < 2:
+        return []
+    xs = range(int(view.left // size), int((view.right - 1) // size) + 1)
+    ys = range(int(view.top // size), int((view.bottom - 1) // size) + 1)
+    # A cell lookup costs a small fraction of culling a segment by its rect.
+    if len(xs) * len(ys) >= 16 * len(key_points):
+        return list(zip(key_points, islice(key_points, 1, None)))
+    grid = snake.segment_grid
+    views = getattr(snake, "views", {})
+    segments = [(key_points[0], key_points[1])]
+    seen = set()
+    for x in xs:
+        for y in ys:
+            for k1 in grid.cells.get((x, y), ()):
+                if k1 not in seen:
+                    seen.add(k1)
+                    k2 = grid.segments[k1][0]
+                    segments.append((views.get(id(k1), k1), views.get(id(k2), k2)))
+    return segments
+
+
+def draw_snake(
+    surface: pygame.Surface,
+    snake: game.Snake,
+    camera: Optional[Camera] = None,
+    scale: float = 1,
+    head_color: pygame.Color = COLOR_BLACK,
+) -> None:
+    size = config.SNAKE_SIZE * scale
+    ox, oy = get_offset(camera, scale)
+    head = snake.key_points[0]
+    hx = (head.x + 0.5) * size - ox
+    hy = (head.y + 0.5) * size - oy
+    clip = surface.get_clip().move(ox, oy)
+    segments = []
+    for k1, k2 in get_visible_segments(snake, clip, size):
+        rect = get_cells_rect(k1.x, k1.y, k2.x, k2.y, size)
+        if clip.colliderect(rect):
+            segments.append((k1, k2, rect))
+    if segments:
+        bounds = segments[0][2].unionall([v for _, _, v in segments]).clip(clip)
+        if bounds:
+            layer = get_snake_layer(bounds.w, bounds.h)
+            layer.fill((0, 0, 0, 0))
+            # Every body part has the same colour, so taking the maximum
+            # coverage merges overlapping edges instead of anti-aliasing them
+            # twice.
+            for k1, k2, _ in segments:
+                x = (k2.x + 0.5) * size
+                y = (k2.y + 0.5) * size
+                sprite = get_aacircle(COLOR_DIM_GRAY, x, y, size / 2)
+                layer.blit(
+                    sprite,
+                    (
+                        math.floor(x - size / 2) - bounds.x,
+                        math.floor(y - size / 2) - bounds.y,
+                    ),
+                    special_flags=pygame.BLEND_RGBA_MAX,
+                )
+                rx1 = min(k1.x, k2.x) * size
+                ry1 = min(k1.y, k2.y) * size
+                rx2 = max(k1.x, k2.x) * size + size
+                ry2 = max(k1.y, k2.y) * size + size
+                if k1.x == k2.x:
+                    ry1 += size / 2
+                    ry2 -= size / 2
+                else:
+                    rx1 += size / 2
+                    rx2 -= size / 2
+                sprite = get_aarectangle(COLOR_DIM_GRAY, rx1, ry1, rx2, ry2)
+                layer.blit(
+                    sprite,
+                    (math.floor(rx1) - bounds.x, math.floor(ry1) - bounds.y),
+                    special_flags=pygame.BLEND_RGBA_MAX,
+                )
+            surface.blit(layer, bounds.move(-ox, -oy))
+
+    if clip.colliderect(get_cells_rect(head.x, head.y, head.x, head.y, size)):
+        fill_aacircle(surface, head_color, hx, hy, size / 2)
+
+
+def draw_foods(
+    surface: pygame.Surface,
+    foods: Iterable[game.Food],
+    camera: Optional[Camera] = None,
+    scale: float = 1,
+) -> None:
+    size = config.SNAKE_SIZE * scale
+    ox, oy = get_offset(camera, scale)
+    clip = surface.get_clip().move(ox, oy)
     for food in foods:
+        if not clip.colliderect(get_cells_rect(food.x, food.y, food.x, food.y, size)):
+            continue
         fill_aacircle(
             surface,
             FOOD_COLOR[food.type],
-            (food.x + 0.5) * config.SNAKE_SIZE,
-            (food.y + 0.5) * config.SNAKE_SIZE,
-            config.SNAKE_SIZE / 2,
+            (food.x + 0.5) * size - ox,
+            (food.y + 0.5) * size - oy,
+            size / 2,
         )
 
 
 def render_score(score: int, font_size: int) -> pygame.Surface:
-    score_font = pygame.font.SysFont(config.DEFAULT_TEXT_FONT_NAME, font_size)
-    prev_text = score_font.render("得分： ", True, COLOR_BLACK)
-    score_text = score_font.render(str(score), True, COLOR_GOLD)
+    prev_text = text.render("得分： ", font_size, COLOR_BLACK)
+    score_text = text.render(str(score), font_size, COLOR_GOLD)
 
     prev_width = prev_text.get_width()
     score_width = score_text.get_width()
@@ -164,91 +322,408 @@ def draw_score(surface: pygame.Surface, score: int, font_size: int, y: int) -> N
 
 
 def draw_game(
-    surface: pygame.Surface, manager: game.GameManager, score: bool = True
+    surface: pygame.Surface,
+    manager: game.GameManager,
+    score: bool = True,
+    snake: Optional[game.Snake] = None,
+    camera: Optional[Camera] = None,
+    scale: float = 1,
 ) -> None:
+    """``snake`` replaces manager.snake, e.g. with an interpolated one.
+    ``scale`` is the size of the drawing relative to the window."""
     surface.fill(COLOR_WHITE)
-    draw_snake(surface, manager.snake)
-    draw_foods(surface, manager.foods)
+    draw_snake(surface, snake or manager.snake, camera, scale)
+    draw_foods(surface, manager.foods, camera, scale)
     if score:
         draw_score(surface, manager.get_score(), 20, 5)
 
 
-def draw_menu(surface: pygame.Surface, game_menu: menu.Menu) -> None:
-    drawing_y = (
-        surface.get_height() - game_menu.contents_height - game_menu.selections_height
-    ) / 2
-    center_x = surface.get_width() / 2
-
-    for v in game_menu.contents:
-        surface.blit(v, (center_x - v.get_width() / 2, drawing_y))
-        drawing_y += v.get_height()
-
-    for i, selection in enumerate(game_menu.selections):
-        size = config.SELECTION_MIN_SIZE
-        color = UNSELECT_COLOR
-        if i == game_menu.select_idx:
-            size += round(
-                (config.SELECT_ANIMATION_MAX_TIME - game_menu.animation_time)
-                / config.SELECT_ANIMATION_MAX_TIME
-                * (config.SELECTION_MAX_SIZE - config.SELECTION_MIN_SIZE)
-            )
-            color = SELECTED_COLOR
-
-            triangle_size = config.SELECTION_MAX_SIZE / 4
-            base = (
-                center_x - game_menu.selections_width / 2 - triangle_size,
-                drawing_y + config.SELECTION_MAX_SIZE / 2,
+def draw_arena(
+    surface: pygame.Surface,
+    board: arena.Arena,
+    camera: Optional[Camera] = None,
+    score: bool = True,
+) -> None:
+    """draw_game for an arena; the heads of the bots are drawn in
+    BOT_HEAD_COLOR. Snakes and foods outside the view are skipped."""
+    surface.fill(COLOR_WHITE)
+    for i, snake in enumerate(board.snakes):
+        if not board.is_bot(i):
+            draw_snake(surface, snake, camera)
+        elif board.alive[i]:
+            draw_snake(surface, snake, camera, head_color=BOT_HEAD_COLOR)
+    draw_foods(surface, board.get_foods(), camera)
+    if score:
+        draw_score(surface, board.get_score(), 20, 5)
+
+
+def merge_rects(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+    merged: list[pygame.Rect] = []
+    for rect in rects:
+        rect = rect.copy()
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class GameRenderer:
+    def __init__(self) -> None:
+        self.valid = False
+        self.key_points: list[tuple[game.SnakeKeyPoint, float, float]] = []
+        self.foods: dict[tuple, pygame.Rect] = {}
+        self.score = -1
+        self.score_surface = pygame.Surface((0, 0))
+        self.score_rect = pygame.Rect(0, 0, 0, 0)
+        self.extra_rects: list[pygame.Rect] = []
+        self.offset = (0, 0)
+        self.scale = 1.0
+
+    def invalidate(self) -> None:
+        self.valid = False
+
+    def add_dirty_rect(self, rect: pygame.Rect) -> None:
+        """Redraw the given area on the next draw, e.g. under an overlay."""
+        self.extra_rects.append(rect.copy())
+
+    def get_snake_dirty_rects(
+        self, snake: game.Snake, size: float
+    ) -> list[pygame.Rect]:
+        rects = []
+        alive = {id(k) for k in snake.key_points}
+        known = set()
+        for i, (k, x, y) in enumerate(self.key_points):
+            known.add(id(k))
+            if id(k) not in alive:
+                _, prev_x, prev_y = self.key_points[i - 1]
+                rects.append(get_cells_rect(prev_x, prev_y, x, y, size))
+            elif k.x != x or k.y != y:
+                rects.append(get_cells_rect(x, y, k.x, k.y, size))
+        for k1, k2 in zip_longest(snake.key_points, islice(snake.key_points, 1, None)):
+            if id(k1) not in known:
+                k2 = k2 or k1
+                rects.append(get_cells_rect(k1.x, k1.y, k2.x, k2.y, size))
+        self.key_points = [(k, k.x, k.y) for k in snake.key_points]
+        return rects
+
+    def get_foods_dirty_rects(
+        self, foods: list[game.Food], size: float
+    ) -> list[pygame.Rect]:
+        current = {
+            (food.x, food.y, food.type): get_cells_rect(
+                food.x, food.y, food.x, food.y, size
             )
-            triangle = [
-                base,
-                (base[0] - triangle_size, base[1] - triangle_size),
-                (base[0] - triangle_size, base[1] + triangle_size),
-            ]
-            pygame.draw.polygon(surface, SELECTED_COLOR, triangle)
-            pygame.draw.aalines(surface, SELECTED_COLOR, True, triangle)
+            for food in foods
+        }
+        rects = [v for k, v in self.foods.items() if k not in current]
+        rects += [v for k, v in current.items() if k not in self.foods]
+        self.foods = current
+        return rects
+
+    def get_score_dirty_rects(
+        self, surface: pygame.Surface, score: int
+    ) -> list[pygame.Rect]:
+        if score == self.score:
+            return []
+        old_rect = self.score_rect
+        self.score = score
+        self.score_surface = render_score(score, 20)
+        self.score_rect = self.score_surface.get_rect()
+        self.score_rect.topleft = (
+            (surface.get_width() - self.score_rect.w) // 2,
+            5,
+        )
+        return [old_rect, self.score_rect]
+
+    def draw(
+        self,
+        surface: pygame.Surface,
+        manager: game.GameManager,
+        snake: Optional[game.Snake] = None,
+        camera: Optional[Camera] = None,
+        scale: float = 1,
+        score: bool = True,
+    ) -> list[pygame.Rect]:
+        snake = snake or manager.snake
+        size = config.SNAKE_SIZE * scale
+        ox, oy = get_offset(camera, scale)
+        if (ox, oy) != self.offset or scale != self.scale:
+            # Everything moved; the next frames with a still camera compare
+            # with this one.
+            self.offset = (ox, oy)
+            self.scale = scale
+            self.valid = False
+        if self.valid:
+            rects = self.get_snake_dirty_rects(snake, size)
+            rects += self.get_foods_dirty_rects(manager.foods, size)
+            rects = [v.move(-ox, -oy) for v in rects]
+        else:
+            self.key_points = [(k, k.x, k.y) for k in snake.key_points]
+            self.foods = {
+                (v.x, v.y, v.type): get_cells_rect(v.x, v.y, v.x, v.y, size)
+                for v in manager.foods
+            }
+            rects = []
+        if score:
+            rects += self.get_score_dirty_rects(surface, manager.get_score())
+        rects += self.extra_rects
+        self.extra_rects = []
+        if not self.valid:
+            rects = [surface.get_rect()]
+            self.valid = True
+
+        screen = surface.get_rect()
+        rects = merge_rects([screen.clip(v) for v in rects if screen.colliderect(v)])
+        for rect in rects:
+            surface.set_clip(rect)
+            draw_game(surface, manager, False, snake, camera, scale)
+            if score and rect.colliderect(self.score_rect):
+                surface.blit(self.score_surface, self.score_rect)
+        surface.set_clip(None)
+        return rects
+
+
+class ScaledRenderer:
+    """Draws the game with a GameRenderer at ``scale`` times the resolution
+    of the window into an offscreen surface, and scales the areas it redrew
+    to the window. The score is drawn over them at the window's resolution.
+
+    The scale is taken as a ratio p/q, so blocks of p offscreen pixels cover
+    exactly q window pixels. Areas are widened to whole blocks and scaled to
+    the nearest pixel, which makes each area come out the same as it would
+    in a scaled copy of the whole surface.
+    """
+
+    def __init__(self, scale: float = config.RENDER_SCALE) -> None:
+        self.renderer = GameRenderer()
+        self.scale = scale
+        self.surface = pygame.Surface((0, 0))
+        self.score = -1
+        self.score_surface = pygame.Surface((0, 0))
+        self.score_rect = pygame.Rect(0, 0, 0, 0)
+
+    def invalidate(self) -> None:
+        self.renderer.invalidate()
+
+    def add_dirty_rect(self, rect: pygame.Rect) -> None:
+        if self.scale == 1:
+            self.renderer.add_dirty_rect(rect)
+        else:
+            self.renderer.add_dirty_rect(self.to_surface(rect))
+
+    def get_ratio(self) -> tuple[int, int]:
+        ratio = Fraction(self.scale).limit_denominator(config.RENDER_SCALE_BLOCK)
+        return ratio.numerator, ratio.denominator
+
+    def to_surface(self, rect: pygame.Rect) -> pygame.Rect:
+        p, q = self.get_ratio()
+        left = rect.left * p // q
+        top = rect.top * p // q
+        return pygame.Rect(
+            left,
+            top,
+            -(-rect.right * p // q) - left,
+            -(-rect.bottom * p // q) - top,
+        )
 
-        font = pygame.font.SysFont(config.DEFAULT_TEXT_FONT_NAME, size)
-        text = font.render(selection, True, color)
-        dy = (config.SELECTION_MAX_SIZE - text.get_height()) / 2
-        surface.blit(text, (center_x - text.get_width() / 2, drawing_y + dy))
-        drawing_y += config.SELECTION_MAX_SIZE + config.SELECTION_SEP_SIZE
+    def scale_rect(self, surface: pygame.Surface, rect: pygame.Rect) -> pygame.Rect:
+        """Scale an area of the offscreen surface to the window and return
+        where it went."""
+        p, q = self.get_ratio()
+        left = rect.left // p * p
+        top = rect.top // p * p
+        source = pygame.Rect(
+            left,
+            top,
+            -(-rect.right // p) * p - left,
+            -(-rect.bottom // p) * p - top,
+        ).clip(self.surface.get_rect())
+        target = pygame.Rect(
+            source.x // p * q, source.y // p * q, source.w // p * q, source.h // p * q
+        )
+        scaled = pygame.transform.scale(self.surface.subsurface(source), target.size)
+        return surface.blit(scaled, target)
+
+    def draw(
+        self,
+        surface: pygame.Surface,
+        manager: game.GameManager,
+        snake: Optional[game.Snake] = None,
+        camera: Optional[Camera] = None,
+    ) -> list[pygame.Rect]:
+        if self.scale == 1:
+            return self.renderer.draw(surface, manager, snake, camera)
+        p, q = self.get_ratio()
+        width, height = surface.get_size()
+        # Whole blocks, even if the last ones reach past the window.
+        size = (-(-width // q) * p, -(-height // q) * p)
+        if self.surface.get_size() != size:
+            self.surface = pygame.Surface(size)
+            self.renderer.invalidate()
+        score = manager.get_score()
+        if score != self.score:
+            self.score = score
+            self.score_surface = render_score(score, 20)
+            self.add_dirty_rect(self.score_rect)
+            self.score_rect = self.score_surface.get_rect()
+            self.score_rect.topleft = ((width - self.score_rect.w) // 2, 5)
+            self.add_dirty_rect(self.score_rect)
+        rects = []
+        for rect in self.renderer.draw(
+            self.surface, manager, snake, camera, p / q, False
+        ):
+            rect = self.scale_rect(surface, rect)
+            rects.append(rect)
+            # Only where the area was just restored, or the translucent
+            # edges of the text would be blended over themselves.
+            if rect.colliderect(self.score_rect):
+                surface.set_clip(rect)
+                surface.blit(self.score_surface, self.score_rect)
+                surface.set_clip(None)
+        return rects
+
+
+class FrameHud:
+    """The frame profiler overlay, re-rendered only when its text changes."""
+
+    def __init__(self) -> None:
+        self.lines: tuple[str, ...] = ()
+        self.surface = pygame.Surface((0, 0))
+        self.rect = pygame.Rect(5, 5, 0, 0)
+
+    def render(self, lines: tuple[str, ...]) -> None:
+        font = text.get_font(
+            config.FRAME_HUD_FONT_SIZE, name=config.FRAME_HUD_FONT_NAME
+        )
+        line_size = font.get_linesize()
+        width = max([font.size(v)[0] for v in lines] + [0])
+        self.surface = pygame.Surface(
+            (width + 10, line_size * len(lines) + 10), pygame.SRCALPHA
+        )
+        self.surface.fill((0, 0, 0, 160))
+        for i, line in enumerate(lines):
+            rendered = font.render(line, True, COLOR_WHITE)
+            self.surface.blit(rendered, (5, 5 + i * line_size))
+        self.rect.size = self.surface.get_size()
+        self.lines = lines
+
+    def draw(self, surface: pygame.Surface, lines: tuple[str, ...]) -> pygame.Rect:
+        if lines != self.lines:
+            self.render(lines)
+        surface.blit(self.surface, self.rect)
+        return self.rect.copy()
+
+
+class Overlay:
+    """Translucent colors over a scene that no longer changes, like the
+    finished game under the end menu.
+
+    The scene is dimmed, anything static is drawn over it, and then it is
+    copied once; later frames only restore the areas that were drawn over it
+    since, instead of drawing the scene again.
+    """
+
+    def __init__(self, colors: list[pygame.Color]) -> None:
+        self.colors = colors
+        self.valid = False
+        self.background = pygame.Surface((0, 0))
+        self.rects: list[pygame.Rect] = []
+
+    def invalidate(self) -> None:
+        self.valid = False
+
+    def add_dirty_rect(self, rect: pygame.Rect) -> None:
+        """Restore the given area on the next frame, e.g. under the HUD."""
+        self.rects.append(rect.copy())
+
+    def dim(self, surface: pygame.Surface) -> None:
+        for color in self.colors:
+            fill_rectangle(surface, color)
+
+    def capture(self, surface: pygame.Surface) -> list[pygame.Rect]:
+        if self.background.get_size() != surface.get_size():
+            self.background = pygame.Surface(surface.get_size())
+        self.background.blit(surface, (0, 0))
+        self.rects = []
+        self.valid = True
+        return [surface.get_rect()]
+
+    def restore(self, surface: pygame.Surface) -> list[pygame.Rect]:
+        rects = merge_rects(self.rects)
+        for rect in rects:
+            surface.blit(self.background, rect, rect)
+        self.rects = []
+        return rects
+
+
+def draw_menu(surface: pygame.Surface, game_menu: menu.Menu) -> pygame.Rect:
+    size = surface.get_size()
+    layer, origin = game_menu.render_layer(size, SELECTED_COLOR, UNSELECT_COLOR)
+    rect = surface.blit(layer, origin)
+    idx = game_menu.select_idx
+    rendered = game_menu.render_selection(
+        idx, game_menu.get_selection_size(), SELECTED_COLOR
+    )
+    pos = game_menu.get_selection_pos(size, idx, rendered)
+    return rect.union(surface.blit(rendered, pos))
 
 
 def draw_end(
-    surface: pygame.Surface, manager: game.GameManager, end_menu: menu.Menu
-) -> None:
-    draw_game(surface, manager, False)
-    color = COLOR_WHITE
-    color.a = 128
-    fill_rectangle(surface, color)
-    draw_menu(surface, end_menu)
-
-
-def draw_help(surface: pygame.Surface) -> None:
-    color = COLOR_CYAN
-    color.a = 180
-    fill_rectangle(surface, color)
-
-    color = COLOR_WHITE
-    color.a = 230
-    fill_rectangle(surface, color)
+    surface: pygame.Surface,
+    manager: Union[game.GameManager, arena.Arena],
+    end_menu: menu.Menu,
+    camera: Optional[Camera] = None,
+    overlay: Optional[Overlay] = None,
+) -> list[pygame.Rect]:
+    """Draw the end menu over the finished game and return the changed areas.
+
+    Pass the same overlay every frame to draw the game only once.
+    """
+    overlay = overlay or Overlay([END_OVERLAY_COLOR])
+    if overlay.valid:
+        rects = overlay.restore(surface)
+    else:
+        if isinstance(manager, arena.Arena):
+            draw_arena(surface, manager, camera, False)
+        else:
+            draw_game(surface, manager, False, camera=camera)
+        overlay.dim(surface)
+        rects = overlay.capture(surface)
+    rect = draw_menu(surface, end_menu)
+    overlay.add_dirty_rect(rect)
+    return rects + [rect]
+
+
+def wrap_text(content: str, font: pygame.font.Font, width: int) -> list[str]:
+    lines = []
+    i = 0
+    for j in range(len(content)):
+        if content[j] == "\n" or font.size(content[i : j + 1])[0] > width:
+            lines.append(content[i:j])
+            i = j + 1 if content[j] == "\n" else j
+    lines.append(content[i:])
+    return lines
+
+
+def draw_help(
+    surface: pygame.Surface, overlay: Optional[Overlay] = None
+) -> list[pygame.Rect]:
+    """Draw the help page over the current screen and return the changed
+    areas. With the same overlay every frame, that happens only once.
+    """
+    overlay = overlay or Overlay(HELP_OVERLAY_COLORS)
+    if overlay.valid:
+        return overlay.restore(surface)
+    overlay.dim(surface)
 
     font_size = 25
-    font = pygame.font.SysFont(config.DEFAULT_TEXT_FONT_NAME, font_size)
+    font = text.get_font(font_size)
     line_size = font.get_linesize()
-    help_text = config.GAME_HELP_TEXT
-
-    text_y = line_size
-    i = 0
-    for j in range(i, len(help_text)):
-        if (
-            help_text[j] == "\n"
-            or font.size(help_text[i : j + 1])[0] > surface.get_width() - 2 * line_size
-        ):
-            render_text = font.render(help_text[i:j], True, COLOR_BLACK)
-            surface.blit(render_text, (line_size, text_y))
-            i = j + 1 if help_text[j] == "\n" else j
-            text_y += line_size
-
-    render_text = font.render(help_text[i:], True, COLOR_BLACK)
-    surface.blit(render_text, (line_size, text_y))
+    lines = wrap_text(config.GAME_HELP_TEXT, font, surface.get_width() - 2 * line_size)
+    for i, line in enumerate(lines):
+        render_text = text.render(line, font_size, COLOR_BLACK)
+        surface.blit(render_text, (line_size, line_size * (i + 1)))
+    # The cached page has the text on it, for restoring areas drawn over.
+    return overlay.capture(surface)
@@ -0,0 +1,43 @@
+from typing import Callable, NamedTuple, Optional
+import config
+import game
+
+Policy = Callable[[game.GameManager], Optional[game.SnakeOrientation]]
+
+
+class RunResult(NamedTuple):
+    score: int
+    end: int
+    steps: int
+    time: float
+    foods: tuple[int, ...]
+
+
+def run(
+    policy: Policy,
+    seed: int,
+    steps: int,
+    dt: float = 1 / config.GAME_MAX_FPS,
+    width: int = config.GAME_WIDTH,
+    height: int = config.GAME_HEIGHT,
+) -> RunResult:
+    """Play one game without a display, asking the policy for a turn every step.
+
+    The game stops after the given number of steps or when the snake dies.
+    ``foods`` counts the eaten foods by FoodType value.
+    """
+    manager = game.GameManager(width, height, seed)
+    manager.playing = True
+    foods = [0] * len(game.FoodType)
+    step = 0
+    while step < steps and manager.end == 0:
+        orientation = policy(manager)
+        if orientation is not None:
+            manager.set_snake_orientation(orientation)
+        before = manager.foods
+        manager.update(dt)
+        for food in before:
+            if food not in manager.foods:
+                foods[food.type.value] += 1
+        step += 1
+    return RunResult(manager.get_score(), manager.end, step, step * dt, tuple(foods))
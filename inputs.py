@@ -0,0 +1,121 @@
+import bisect
+from collections import deque
+import config
+import game
+
+# Upper bounds of the latency histogram buckets in milliseconds.
+LATENCY_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+LATENCY_BAR_WIDTH = 30
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.samples: list[float] = []
+
+    def add(self, latency: float) -> None:
+        self.samples.append(latency)
+
+    def get_percentiles(self) -> tuple[float, float, float]:
+        """p50, p95 and p99 in milliseconds."""
+        n = len(self.samples)
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        values = sorted(self.samples)
+        return tuple(values[round(q * (n - 1))] * 1000 for q in (0.5, 0.95, 0.99))
+
+    def get_counts(self) -> list[int]:
+        """Samples per bucket of LATENCY_BUCKETS, and over the last one."""
+        counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for v in self.samples:
+            counts[bisect.bisect_left(LATENCY_BUCKETS, v * 1000)] += 1
+        return counts
+
+    def get_report_lines(self, title: str) -> tuple[str, ...]:
+        if not self.samples:
+            return (f"{title}  no inputs",)
+        p50, p95, p99 = self.get_percentiles()
+        lines = [
+            f"{title}  n {len(self.samples)}  p50 {p50:.2f}  p95 {p95:.2f}"
+            f"  p99 {p99:.2f}  max {max(self.samples) * 1000:.2f} ms"
+        ]
+        counts = self.get_counts()
+        peak = max(counts)
+        for i, count in enumerate(counts):
+            if i < len(LATENCY_BUCKETS):
+                label = f"< {LATENCY_BUCKETS[i]:>4}"
+            else:
+                label = f">={LATENCY_BUCKETS[-1]:>4}"
+            bar = "#" * round(count / peak * LATENCY_BAR_WIDTH)
+            lines.append(f"  {label} ms {count:6} {bar}")
+        return tuple(lines)
+
+
+class InputQueue:
+    """Turns of the player, applied by FixedTimestep at the tick they are due.
+
+    Every turn carries the perf_counter time of its key press, and is due at
+    the first tick that starts after it, so a slow frame does not delay it.
+    While the head is still within one unit of the last turn, where
+    Snake.set_orientation would drop it, the turn waits and is applied at the
+    first tick it is allowed, so a quick second turn is not lost. Turns are
+    applied in order, and any that come while ``size`` are waiting are
+    dropped.
+
+    The ticks of the applied turns are kept in ``applied`` for recordings.
+    The time from the key press to that tick, and to the display update of
+    the frame that showed it, go into two latency histograms.
+    """
+
+    def __init__(self, size: int = config.INPUT_QUEUE_SIZE) -> None:
+        self.size = size
+        self.turns: deque[tuple[float, game.SnakeOrientation]] = deque()
+        self.applied: list[tuple[int, game.SnakeOrientation]] = []
+        self.unpresented: list[float] = []
+        self.dropped = 0
+        self.applied_latency = LatencyHistogram()
+        self.presented_latency = LatencyHistogram()
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def push(self, orientation: game.SnakeOrientation, timestamp: float) -> None:
+        if len(self.turns) >= self.size:
+            self.dropped += 1
+        else:
+            self.turns.append((timestamp, orientation))
+
+    def clear(self) -> None:
+        self.turns.clear()
+        self.unpresented.clear()
+
+    def apply(self, manager: game.GameManager, tick: int, start: float) -> None:
+        """Apply the turns due at ``tick``, which starts at time ``start``."""
+        snake = manager.snake
+        while self.turns and self.turns[0][0] <= start:
+            timestamp, orientation = self.turns[0]
+            if snake.is_turn(orientation) and not snake.is_turn_ready():
+                break
+            self.turns.popleft()
+            # Also the turns that do not turn: the first key starts the game.
+            manager.set_snake_orientation(orientation)
+            self.applied.append((tick, orientation))
+            self.applied_latency.add(start - timestamp)
+            self.unpresented.append(timestamp)
+
+    def take_applied(self) -> list[tuple[int, game.SnakeOrientation]]:
+        applied = self.applied
+        self.applied = []
+        return applied
+
+    def present(self, now: float) -> None:
+        """Record that the turns applied so far are on the screen at ``now``."""
+        for timestamp in self.unpresented:
+            self.presented_latency.add(now - timestamp)
+        self.unpresented.clear()
+
+    def get_report_lines(self) -> tuple[str, ...]:
+        return (
+            self.applied_latency.get_report_lines("input to applied  ")
+            + self.presented_latency.get_report_lines("input to presented")
+            + (f"dropped {self.dropped} inputs of a full queue",)
+        )
@@ -1,14 +1,29 @@
+import time
+
+LAUNCH_TIME = time.perf_counter()
+
+import argparse
+import random
+from typing import Any, Optional
 import pygame
 from config import *
+import arena
+import autopilot
+import controls
 import graphics
 import game
+import inputs
 import menu
+import pacing
+import profiling
+import replay
+import text
+import timestep
 
 
 def create_start_menu() -> menu.Menu:
     start_menu = menu.Menu(["开始游戏", "帮助", "退出"])
-    title_font = pygame.font.SysFont(DEFAULT_TEXT_FONT_NAME, 100, True)
-    start_menu.add_content(title_font.render("贪吃蛇", True, graphics.COLOR_BLACK))
+    start_menu.add_content(text.render("贪吃蛇", 100, graphics.COLOR_BLACK, True))
     start_menu.add_content(pygame.Surface((0, 30)))
     return start_menu
 
@@ -17,24 +32,27 @@ def create_end_menu(score: int, reason: int) -> menu.Menu:
     reason_text = "触碰边界" if reason == 1 else "触碰身体"
     reason_text = "结束原因：" + reason_text
     end_menu = menu.Menu(["重新开始", "退出"])
-    title_font = pygame.font.SysFont(DEFAULT_TEXT_FONT_NAME, 80, True)
-    reason_font = pygame.font.SysFont(DEFAULT_TEXT_FONT_NAME, 25)
-    end_menu.add_content(title_font.render("游戏结束", True, graphics.COLOR_DARK_RED))
+    end_menu.add_content(text.render("游戏结束", 80, graphics.COLOR_DARK_RED, True))
     end_menu.add_content(pygame.Surface((0, 30)))
-    end_menu.add_content(reason_font.render(reason_text, True, graphics.COLOR_DARK_RED))
+    end_menu.add_content(text.render(reason_text, 25, graphics.COLOR_DARK_RED))
     end_menu.add_content(pygame.Surface((0, 25)))
     end_menu.add_content(graphics.render_score(score, 25))
     end_menu.add_content(pygame.Surface((0, 30)))
     return end_menu
 
 
-def show_start_menu(display: pygame.Surface) -> bool:
+def show_start_menu(
+    display: pygame.Surface,
+    profile: Optional[profiling.StartupProfile] = None,
+    pacer: Optional[pacing.FramePacer] = None,
+) -> bool:
     start_menu = create_start_menu()
-    clock = pygame.time.Clock()
+    help_overlay = graphics.Overlay(graphics.HELP_OVERLAY_COLORS)
+    pacer = pacer or pacing.FramePacer()
     show_help = False
     keep_going = True
     while keep_going:
-        for event in pygame.event.get():
+        for event in pacer.wait(start_menu.animation_time > 0):
             if event.type == pygame.QUIT:
                 return False
             if show_help:
@@ -51,55 +69,341 @@ def show_start_menu(display: pygame.Surface) -> bool:
             elif r == "退出":
                 return False
 
-        clock.tick(GAME_MAX_FPS)
-        start_menu.update(clock.get_time() / 1000)
+        start_menu.update(pacer.get_time())
 
-        display.fill(graphics.COLOR_WHITE)
-        graphics.draw_menu(display, start_menu)
         if show_help:
-            graphics.draw_help(display)
-        pygame.display.update()
+            # The menu stays on the screen under the help page.
+            pygame.display.update(graphics.draw_help(display, help_overlay))
+        else:
+            help_overlay.invalidate()
+            display.fill(graphics.COLOR_WHITE)
+            graphics.draw_menu(display, start_menu)
+            pygame.display.update()
+        if profile:
+            profile.mark("first frame")
+            print(profile.report(), flush=True)
+            profile = None
+
+
+def get_next(values: list, current: Any) -> Any:
+    """The value after ``current`` in ``values``, wrapping around."""
+    i = values.index(current) if current in values else -1
+    return values[(i + 1) % len(values)]
+
 
+def save_replay(recording: replay.Recording) -> None:
+    try:
+        replay.save_to_dir(recording)
+    except OSError as e:
+        print(f"failed to save replay: {e}")
 
-def main() -> None:
+
+def main(
+    profile_startup: bool = False,
+    frame_profiler: Optional[profiling.FrameProfiler] = None,
+    pilot: Optional[autopilot.Autopilot] = None,
+    board: tuple[int, int] = (GAME_WIDTH, GAME_HEIGHT),
+    pacer: Optional[pacing.FramePacer] = None,
+    render_scale: float = RENDER_SCALE,
+    dynamic_resolution: bool = False,
+    input_latency: bool = False,
+) -> None:
+    profile = profiling.StartupProfile(LAUNCH_TIME) if profile_startup else None
+    if profile:
+        profile.mark("module imports")
     pygame.init()
-    manager = game.GameManager(GAME_WIDTH, GAME_HEIGHT)
-    display = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    if profile:
+        profile.mark("pygame.init")
+    seed = random.getrandbits(64)
+    manager = game.GameManager(*board, seed)
+    recording = replay.Recording(seed, *board)
+    pacer = pacer or pacing.FramePacer()
+    display = pacer.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption('贪吃蛇小游戏')
+    if profile:
+        profile.mark("display")
+    text.resolve_font(DEFAULT_TEXT_FONT_NAME, False)
+    text.resolve_font(DEFAULT_TEXT_FONT_NAME, True)
+    if profile:
+        profile.mark("font resolution")
     end_menu = menu.Menu([""])
-    clock = pygame.time.Clock()
+    renderer = graphics.ScaledRenderer(render_scale)
+    resolution = None
+    if dynamic_resolution:
+        resolution = pacing.DynamicResolution(1 / pacer.max_fps)
+        resolution.set_scale(render_scale)
+    camera = graphics.Camera()
+    end_overlay = graphics.Overlay([graphics.END_OVERLAY_COLOR])
+    simulation = timestep.FixedTimestep(manager)
+    input_queue = inputs.InputQueue()
+    if pilot:
+        simulation.controller = pilot.steer
+    else:
+        simulation.inputs = input_queue
+    hud = graphics.FrameHud()
 
-    keep_going = show_start_menu(display)
+    keep_going = show_start_menu(display, profile, pacer)
     game_end = False
     while keep_going:
-        for event in pygame.event.get():
+        animating = (
+            pilot is not None
+            or (manager.playing and manager.end == 0)
+            or len(input_queue) > 0
+            or end_menu.animation_time > 0
+            or (frame_profiler and frame_profiler.show_hud)
+        )
+        if frame_profiler:
+            frame_profiler.begin_frame()
+        events = pacer.wait(animating)
+        work_start = time.perf_counter()
+        if frame_profiler:
+            frame_profiler.mark("wait")
+        for event in events:
             if event.type == pygame.QUIT:
                 keep_going = False
-            manager.handle_event(event)
+            if frame_profiler and event.type == pygame.KEYDOWN:
+                if event.key == controls.FRAME_HUD_KEY:
+                    frame_profiler.toggle_hud()
+                    renderer.invalidate()
+            if event.type == pygame.KEYDOWN:
+                if event.key == controls.RENDER_SCALE_KEY:
+                    renderer.scale = get_next(RENDER_SCALES, renderer.scale)
+                    resolution = None
+                elif event.key == controls.SSAA_KEY:
+                    graphics.set_ssaa(get_next(SSAA_LEVELS, graphics.get_ssaa()))
+                    renderer.invalidate()
+                elif event.key == controls.DYNAMIC_RESOLUTION_KEY:
+                    if resolution:
+                        resolution = None
+                    else:
+                        resolution = pacing.DynamicResolution(1 / pacer.max_fps)
+                        resolution.set_scale(renderer.scale)
+            if not pilot:
+                controls.handle_game_event(manager, input_queue, event)
             if game_end:
                 r = end_menu.handle_event(event)
                 if r == "重新开始":
                     game_end = False
-                    manager.reset_game()
+                    seed = random.getrandbits(64)
+                    manager.reset_game(seed)
+                    simulation.reset()
+                    recording = replay.Recording(seed, *board)
                 elif r == "退出":
                     keep_going = False
 
-        clock.tick(GAME_MAX_FPS)
-        delta = min(0.2, clock.get_time() / 1000)
-        manager.update(delta)
+        if frame_profiler:
+            frame_profiler.mark("events")
+        delta = min(MAX_FRAME_TIME, pacer.get_time())
+        if pilot:
+            pilot.plan(manager)
+        simulation.advance(delta, pacer.frame_time)
+        for tick, orientation in input_queue.take_applied():
+            recording.add_input(tick, orientation)
         if manager.end and not game_end:
             game_end = True
+            input_queue.clear()
             end_menu = create_end_menu(manager.get_score(), manager.end)
+            end_overlay.invalidate()
+            if not pilot:
+                recording.finish(simulation.ticks, manager.get_score(), manager.end)
+                save_replay(recording)
         end_menu.update(delta)
+        if frame_profiler:
+            frame_profiler.mark("update")
 
+        show_hud = frame_profiler and frame_profiler.show_hud
+        rects = []
+        snake = simulation.get_render_snake()
         if manager.end == 0:
-            graphics.draw_game(display, manager)
+            camera.follow(snake.key_points[0].x, snake.key_points[0].y, *board)
+        if manager.end != 0:
+            rects = graphics.draw_end(display, manager, end_menu, camera, end_overlay)
+            renderer.invalidate()
+        else:
+            if not DIRTY_RECTS:
+                renderer.invalidate()
+            elif show_hud:
+                renderer.add_dirty_rect(hud.rect)
+            rects = renderer.draw(display, manager, snake, camera)
+        if show_hud:
+            rects.append(hud.draw(display, frame_profiler.hud_lines))
+            if manager.end != 0:
+                end_overlay.add_dirty_rect(hud.rect)
+        if frame_profiler:
+            frame_profiler.mark("draw")
+        if manager.end == 0 and not DIRTY_RECTS:
+            pygame.display.update()
         else:
-            graphics.draw_end(display, manager, end_menu)
-        pygame.display.update()
+            pygame.display.update(rects)
+        input_queue.present(time.perf_counter())
+        if resolution and manager.playing and manager.end == 0 and not pacer.idle:
+            renderer.scale = resolution.update(time.perf_counter() - work_start)
+        if frame_profiler:
+            frame_profiler.mark("display")
+            frame_profiler.end_frame()
+
+    pygame.quit()
+    if frame_profiler:
+        for path in frame_profiler.close():
+            print(f"saved profile of a slow frame to {path}")
+    if input_latency:
+        print("\n".join(input_queue.get_report_lines()))
+
 
+def main_arena(
+    bots: int = ARENA_BOTS,
+    board: tuple[int, int] = (ARENA_WIDTH, ARENA_HEIGHT),
+    pacer: Optional[pacing.FramePacer] = None,
+) -> None:
+    """Play against bots in an arena.Arena. The bots never stop, so every
+    frame is drawn in full; arena games are not saved as replays."""
+    pygame.init()
+    pacer = pacer or pacing.FramePacer()
+    display = pacer.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("贪吃蛇小游戏")
+    camera = graphics.Camera()
+    end_overlay = graphics.Overlay([graphics.END_OVERLAY_COLOR])
+    end_menu = None
+    game_arena = arena.Arena(*board, bots + 1, random.getrandbits(64))
+
+    keep_going = show_start_menu(display, None, pacer)
+    while keep_going:
+        for event in pacer.wait(True):
+            if event.type == pygame.QUIT:
+                keep_going = False
+            elif end_menu:
+                r = end_menu.handle_event(event)
+                if r == "重新开始":
+                    end_menu = None
+                    game_arena = arena.Arena(*board, bots + 1, random.getrandbits(64))
+                elif r == "退出":
+                    keep_going = False
+            elif event.type == pygame.KEYDOWN:
+                orientation = controls.KEY_ORIENTATIONS.get(event.key)
+                if orientation is not None:
+                    game_arena.set_snake_orientation(orientation)
+
+        delta = min(MAX_FRAME_TIME, pacer.get_time())
+        game_arena.update(delta)
+        if game_arena.end and not end_menu:
+            end_menu = create_end_menu(game_arena.get_score(), game_arena.end)
+            end_overlay.invalidate()
+        if end_menu:
+            end_menu.update(delta)
+            rects = graphics.draw_end(
+                display, game_arena, end_menu, camera, end_overlay
+            )
+            pygame.display.update(rects)
+        else:
+            head = game_arena.snakes[0].key_points[0]
+            camera.follow(head.x, head.y, *board)
+            graphics.draw_arena(display, game_arena, camera)
+            pygame.display.update()
     pygame.quit()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print how long each startup phase took until the first frame",
+    )
+    parser.add_argument(
+        "--profile-frames",
+        action="store_true",
+        help="time each phase of every frame, F3 shows the percentiles",
+    )
+    parser.add_argument(
+        "--profile-csv", metavar="PATH", help="write the time of every frame to a CSV"
+    )
+    parser.add_argument(
+        "--profile-slowest",
+        type=int,
+        default=0,
+        metavar="N",
+        help="save cProfile captures of the N slowest frames",
+    )
+    parser.add_argument(
+        "--autopilot", action="store_true", help="let the computer play the game"
+    )
+    parser.add_argument(
+        "--board-size",
+        type=int,
+        nargs=2,
+        metavar=("WIDTH", "HEIGHT"),
+        help="cells of the board; the view follows the snake on larger ones",
+    )
+    parser.add_argument(
+        "--arena", action="store_true", help="play on a large board against bots"
+    )
+    parser.add_argument(
+        "--bots", type=int, default=ARENA_BOTS, help="bots in the arena"
+    )
+    parser.add_argument(
+        "--max-fps", type=int, default=GAME_MAX_FPS, help="frame rate while animating"
+    )
+    parser.add_argument(
+        "--cap-to-refresh-rate",
+        action="store_true",
+        help="never draw faster than the display refreshes",
+    )
+    parser.add_argument(
+        "--no-adaptive-pacing",
+        action="store_true",
+        help="redraw static screens at the full frame rate too",
+    )
+    parser.add_argument(
+        "--render-scale",
+        type=float,
+        default=RENDER_SCALE,
+        help="resolution of the game relative to the window, F5 cycles it",
+    )
+    parser.add_argument(
+        "--ssaa",
+        type=int,
+        choices=SSAA_LEVELS,
+        default=SSAA,
+        help="supersampling per side of every shape, F6 cycles it",
+    )
+    parser.add_argument(
+        "--dynamic-resolution",
+        action="store_true",
+        help="lower the render scale while frames go over budget, F7 toggles it",
+    )
+    parser.add_argument(
+        "--input-latency",
+        action="store_true",
+        help="print histograms of the time from key presses to the screen at exit",
+    )
+    args = parser.parse_args()
+    if args.arena and args.autopilot:
+        parser.error("--autopilot does not play in the arena")
+    frame_profiler = None
+    if args.profile_frames or args.profile_csv or args.profile_slowest:
+        frame_profiler = profiling.FrameProfiler(
+            FRAME_PROFILE_PHASES,
+            csv_path=args.profile_csv,
+            capture_slowest=args.profile_slowest,
+        )
+    pilot = autopilot.Autopilot() if args.autopilot else None
+    pacer = pacing.FramePacer(
+        args.max_fps,
+        not args.no_adaptive_pacing,
+        refresh_cap=args.cap_to_refresh_rate,
+    )
+    graphics.set_ssaa(args.ssaa)
+    if args.arena:
+        board = tuple(args.board_size or (ARENA_WIDTH, ARENA_HEIGHT))
+        main_arena(args.bots, board, pacer)
+    else:
+        main(
+            args.profile_startup,
+            frame_profiler,
+            pilot,
+            tuple(args.board_size or (GAME_WIDTH, GAME_HEIGHT)),
+            pacer,
+            args.render_scale,
+            args.dynamic_resolution,
+            args.input_latency,
+        )
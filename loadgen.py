@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional
+import config
+import game
+import protocol
+
+# Distance from a wall at which the clients turn away from it.
+WALL_MARGIN = 3
+TURN_CHANCE = 0.05
+MAX_SERVER_MESSAGE = 1 << 20
+MOVES = {
+    game.SnakeOrientation.UP: (0, -1),
+    game.SnakeOrientation.LEFT: (-1, 0),
+    game.SnakeOrientation.RIGHT: (1, 0),
+    game.SnakeOrientation.DOWN: (0, 1),
+}
+
+
+def choose_orientation(
+    mirror: protocol.Mirror, rng: random.Random
+) -> Optional[game.SnakeOrientation]:
+    """Start the game, then turn at random now and then and away from walls."""
+    if not mirror.key_points or mirror.end:
+        return None
+    if len(mirror.key_points) == 1:
+        return rng.choice(list(game.SnakeOrientation))
+    x, y, value = mirror.key_points[0]
+    orientation = game.SnakeOrientation(value)
+    dx, dy = MOVES[orientation]
+    ahead_x = x + dx * WALL_MARGIN
+    ahead_y = y + dy * WALL_MARGIN
+    if 0 < ahead_x < mirror.width - 1 and 0 < ahead_y < mirror.height - 1:
+        if rng.random() < TURN_CHANCE:
+            return rng.choice(list(game.SnakeOrientation))
+        return None
+    if dx:
+        up = y > mirror.height / 2
+        return game.SnakeOrientation.UP if up else game.SnakeOrientation.DOWN
+    left = x > mirror.width / 2
+    return game.SnakeOrientation.LEFT if left else game.SnakeOrientation.RIGHT
+
+
+class ClientStats:
+    def __init__(self) -> None:
+        self.bytes = 0
+        self.messages = 0
+        self.snapshots = 0
+        # Arrival time minus the tick's scheduled time, up to a constant.
+        self.offsets: list[float] = []
+
+
+async def run_client(
+    host: str,
+    port: int,
+    room: int,
+    tick_rate: int,
+    duration: float,
+    steer: bool,
+    stats: ClientStats,
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(protocol.encode_join(room))
+    mirror = protocol.Mirror()
+    rng = random.Random(room)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    try:
+        while True:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(
+                    protocol.read_message(reader, MAX_SERVER_MESSAGE), timeout
+                )
+            except asyncio.TimeoutError:
+                break
+            now = loop.time()
+            mirror.apply(message)
+            stats.bytes += len(message) + 1
+            stats.messages += 1
+            if message[0] == protocol.SNAPSHOT:
+                stats.snapshots += 1
+            else:
+                stats.offsets.append(now - mirror.tick / tick_rate)
+            if steer:
+                orientation = choose_orientation(mirror, rng)
+                if orientation is not None:
+                    writer.write(protocol.encode_orientation(orientation))
+    finally:
+        writer.close()
+
+
+def get_jitter(offsets: list[float]) -> list[float]:
+    """Lateness of every delta relative to the earliest one of its client."""
+    if not offsets:
+        return []
+    base = min(offsets)
+    return [v - base for v in offsets]
+
+
+async def run(
+    host: str,
+    port: int,
+    rooms: int,
+    clients_per_room: int,
+    tick_rate: int,
+    duration: float,
+) -> list[ClientStats]:
+    stats = [ClientStats() for _ in range(rooms * clients_per_room)]
+    tasks = []
+    for room in range(rooms):
+        for i in range(clients_per_room):
+            client = stats[room * clients_per_room + i]
+            # Only the first client of a room steers it.
+            tasks.append(
+                run_client(host, port, room, tick_rate, duration, i == 0, client)
+            )
+    await asyncio.gather(*tasks)
+    return stats
+
+
+def report(stats: list[ClientStats], clients_per_room: int, duration: float) -> None:
+    jitter = sorted(v for s in stats for v in get_jitter(s.offsets))
+    if not jitter:
+        print("no deltas received")
+        return
+    rooms = len(stats) // clients_per_room
+    received = sum(s.bytes for s in stats[::clients_per_room])
+    messages = sum(s.messages for s in stats)
+    p99 = jitter[min(len(jitter) - 1, int(len(jitter) * 0.99))]
+    print(f"rooms      {rooms}  clients {len(stats)}")
+    print(f"messages   {messages}  ({messages / duration:.0f}/s)")
+    print(f"snapshots  {sum(s.snapshots for s in stats)}")
+    print(
+        f"bandwidth  {received / rooms / duration / 1024:.2f} KiB/s per room"
+        f"  ({received / max(1, messages // clients_per_room):.1f} bytes/message)"
+    )
+    print(
+        f"jitter     median {statistics.median(jitter) * 1000:.2f} ms"
+        f"  p99 {p99 * 1000:.2f} ms  max {jitter[-1] * 1000:.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="load test a pysnake server")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("-r", "--rooms", type=int, default=100)
+    parser.add_argument("-c", "--clients-per-room", type=int, default=1)
+    parser.add_argument("-t", "--time", type=float, default=10, help="seconds")
+    parser.add_argument(
+        "--tick-rate",
+        type=int,
+        default=config.SERVER_TICK_RATE,
+        help="tick rate of the server",
+    )
+    parser.add_argument(
+        "--spawn-server",
+        action="store_true",
+        help="start a server on the port for the duration of the test",
+    )
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"),
+                "--host",
+                args.host,
+                "--port",
+                str(args.port),
+                "--tick-rate",
+                str(args.tick_rate),
+            ]
+        )
+        time.sleep(1)
+    try:
+        stats = asyncio.run(
+            run(
+                args.host,
+                args.port,
+                args.rooms,
+                args.clients_per_room,
+                args.tick_rate,
+                args.time,
+            )
+        )
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    report(stats, args.clients_per_room, args.time)
+
+
+if __name__ == "__main__":
+    main()
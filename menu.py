@@ -2,6 +2,7 @@ import math
 from typing import Optional
 import config
 import pygame
+import text
 
 
 class Menu:
@@ -11,13 +12,10 @@ class Menu:
         self.animation_time = 0
         self.contents = []
         self.contents_height = 0
+        self.rendered: dict[tuple, pygame.Surface] = {}
+        self.layer: Optional[tuple[tuple, pygame.Surface, tuple[int, int]]] = None
         self.selections_width = max(
-            [
-                pygame.font.SysFont(
-                    config.DEFAULT_TEXT_FONT_NAME, config.SELECTION_MAX_SIZE
-                ).size(v)[0]
-                for v in selections
-            ]
+            [text.get_font(config.SELECTION_MAX_SIZE).size(v)[0] for v in selections]
         )
         self.selections_height = (
             len(selections) * config.SELECTION_MAX_SIZE
@@ -27,6 +25,7 @@ class Menu:
     def add_content(self, content: pygame.Surface):
         self.contents.append(content.copy())
         self.contents_height += content.get_height()
+        self.layer = None
 
     def update(self, dt: float):
         self.animation_time = max(0, self.animation_time - dt)
@@ -35,8 +34,118 @@ class Menu:
         idx = max(0, min(len(self.selections) - 1, idx))
         if self.select_idx != idx:
             self.select_idx = idx
+            self.layer = None
             self.animation_time = config.SELECT_ANIMATION_MAX_TIME
 
+    def get_selection_size(self) -> int:
+        """The font size of the selected item, growing while it animates."""
+        return config.SELECTION_MIN_SIZE + round(
+            (config.SELECT_ANIMATION_MAX_TIME - self.animation_time)
+            / config.SELECT_ANIMATION_MAX_TIME
+            * (config.SELECTION_MAX_SIZE - config.SELECTION_MIN_SIZE)
+        )
+
+    def get_top(self, height: int) -> float:
+        return (height - self.contents_height - self.selections_height) / 2
+
+    def get_selection_y(self, height: int, idx: int) -> float:
+        return (
+            self.get_top(height)
+            + self.contents_height
+            + idx * (config.SELECTION_MAX_SIZE + config.SELECTION_SEP_SIZE)
+        )
+
+    def render_selection(
+        self, idx: int, size: int, color: pygame.Color
+    ) -> pygame.Surface:
+        """Render a selection once per size and color, then reuse it."""
+        key = (idx, size, tuple(color))
+        rendered = self.rendered.get(key)
+        if rendered is None:
+            rendered = text.get_font(size).render(self.selections[idx], True, color)
+            self.rendered[key] = rendered
+        return rendered
+
+    def get_selection_pos(
+        self, size: tuple[int, int], idx: int, rendered: pygame.Surface
+    ) -> tuple[int, int]:
+        width, height = size
+        x = width / 2 - rendered.get_width() / 2
+        y = self.get_selection_y(height, idx)
+        y += (config.SELECTION_MAX_SIZE - rendered.get_height()) / 2
+        # Truncated like the float positions Surface.blit is given.
+        return int(x), int(y)
+
+    def render_layer(
+        self,
+        size: tuple[int, int],
+        selected_color: pygame.Color,
+        unselected_color: pygame.Color,
+    ) -> tuple[pygame.Surface, tuple[int, int]]:
+        """Return everything but the selected item, composed into one surface,
+        and where to blit it. Kept until the selection or the contents change.
+        """
+        key = (size, tuple(selected_color), tuple(unselected_color))
+        if self.layer and self.layer[0] == key:
+            return self.layer[1], self.layer[2]
+
+        width, height = size
+        center_x = width / 2
+        triangle_size = config.SELECTION_MAX_SIZE / 4
+        left = center_x - self.selections_width / 2 - 2 * triangle_size
+        right = center_x + self.selections_width / 2
+        for v in self.contents:
+            left = min(left, center_x - v.get_width() / 2)
+            right = max(right, center_x + v.get_width() / 2)
+        top = self.get_top(height)
+        origin = (math.floor(left), math.floor(top))
+        layer = pygame.Surface(
+            (
+                math.ceil(right) - origin[0] + 1,
+                math.ceil(top + self.contents_height + self.selections_height)
+                - origin[1]
+                + 1,
+            ),
+            pygame.SRCALPHA,
+        )
+        # Transparent pixels of the triangle's color keep its antialiased
+        # edges from blending with black.
+        layer.fill((*selected_color[:3], 0))
+
+        drawing_y = top
+        for v in self.contents:
+            x = int(center_x - v.get_width() / 2)
+            layer.blit(v, (x - origin[0], int(drawing_y) - origin[1]))
+            drawing_y += v.get_height()
+
+        for i in range(len(self.selections)):
+            if i == self.select_idx:
+                continue
+            rendered = self.render_selection(
+                i, config.SELECTION_MIN_SIZE, unselected_color
+            )
+            x, y = self.get_selection_pos(size, i, rendered)
+            layer.blit(rendered, (x - origin[0], y - origin[1]))
+
+        base = (
+            center_x - self.selections_width / 2 - triangle_size - origin[0],
+            self.get_selection_y(height, self.select_idx)
+            + config.SELECTION_MAX_SIZE / 2
+            - origin[1],
+        )
+        triangle = [
+            base,
+            (base[0] - triangle_size, base[1] - triangle_size),
+            (base[0] - triangle_size, base[1] + triangle_size),
+        ]
+        pygame.draw.polygon(layer, selected_color, triangle)
+        pygame.draw.aalines(layer, selected_color, True, triangle)
+        # Most of the layer is transparent, which RLE blits skip over.
+        layer.set_alpha(255, pygame.RLEACCEL)
+
+        self.layer = (key, layer, origin)
+        return layer, origin
+
     def get_idx_from_screen(self, pos: tuple[int, int]) -> int:
         x, y = pos
         if abs(x - config.WINDOW_WIDTH / 2) <= self.selections_width / 2:
@@ -0,0 +1,186 @@
+import glob
+import time
+from typing import Optional
+import pygame
+import config
+
+RAPL_ENERGY_FILES = "/sys/class/powercap/intel-rapl:*/energy_uj"
+
+
+def get_refresh_rate() -> Optional[int]:
+    """The refresh rate of the display, if pygame can tell."""
+    # Only pygame-ce has this; pygame 2 cannot query the refresh rate.
+    get_rate = getattr(pygame.display, "get_current_refresh_rate", None)
+    try:
+        rate = get_rate() if get_rate else 0
+    except pygame.error:
+        rate = 0
+    return rate or None
+
+
+def read_energy() -> Optional[float]:
+    """Joules used by all CPU packages so far, where RAPL is readable."""
+    paths = glob.glob(RAPL_ENERGY_FILES)
+    if not paths:
+        return None
+    try:
+        return sum(int(open(v).read()) for v in paths) / 1e6
+    except (OSError, ValueError):
+        return None
+
+
+class FramePacer:
+    """Waits for the next frame and collects the events that came meanwhile.
+
+    While something animates, frames run at ``max_fps``. Otherwise, with
+    ``adaptive`` set, the loop blocks in pygame.event.wait until an event
+    comes or ``idle_timeout`` passes, so a static screen costs no CPU. The
+    time spent waiting idle is not reported by get_time, since nothing
+    moved during it.
+
+    Active frames also wait in pygame.event.wait, until the frame is due,
+    rather than sleeping, so that events are taken from the queue as they
+    come. Every event gets the time.perf_counter time it was taken at as
+    ``timestamp``, the closest to its real time pygame 2 can tell.
+
+    With ``refresh_cap``, set_mode opens the window so that frames never run
+    faster than the display refreshes.
+    """
+
+    def __init__(
+        self,
+        max_fps: int = config.GAME_MAX_FPS,
+        adaptive: bool = config.ADAPTIVE_PACING,
+        idle_timeout: float = config.IDLE_TIMEOUT,
+        refresh_cap: bool = False,
+    ) -> None:
+        self.max_fps = max_fps
+        self.adaptive = adaptive
+        self.idle_timeout = idle_timeout
+        self.refresh_cap = refresh_cap
+        self.frame_time = time.perf_counter()
+        self.elapsed = 0.0
+        self.idle = False
+        self.frames = 0
+        self.idle_frames = 0
+
+    def set_mode(self, size: tuple[int, int]) -> pygame.Surface:
+        """pygame.display.set_mode, capped to the refresh rate with
+        ``refresh_cap``.
+
+        The rate can only be read once the window is open, and pygame 2
+        cannot read it at all; the window is then opened again to wait for
+        vsync, which needs the SCALED flag, and a warning is printed when
+        that is not available either.
+        """
+        display = pygame.display.set_mode(size)
+        if not self.refresh_cap:
+            return display
+        rate = get_refresh_rate()
+        if rate:
+            self.max_fps = min(self.max_fps, rate)
+            return display
+        try:
+            return pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+        except pygame.error as e:
+            print(
+                "warning: frames are not capped to the refresh rate, which"
+                f" pygame cannot tell, and vsync is not available: {e}"
+            )
+            return pygame.display.set_mode(size)
+
+    def wait(self, animating: bool) -> list[pygame.event.Event]:
+        self.frames += 1
+        self.idle = self.adaptive and not animating
+        if self.idle:
+            self.idle_frames += 1
+            events = self.get_events(self.idle_timeout, True)
+        else:
+            due = self.frame_time + 1 / self.max_fps
+            events = self.get_events(due - time.perf_counter(), False)
+        now = time.perf_counter()
+        self.elapsed = now - self.frame_time
+        self.frame_time = now
+        return events
+
+    def get_events(self, timeout: float, until_first: bool) -> list[pygame.event.Event]:
+        """Stamp the events that come within ``timeout`` seconds, returning
+        at the first one with ``until_first``."""
+        deadline = time.perf_counter() + timeout
+        events = []
+        while True:
+            now = time.perf_counter()
+            for event in pygame.event.get():
+                event.timestamp = now
+                events.append(event)
+            wait_ms = int((deadline - now) * 1000)
+            if wait_ms <= 0 or (events and until_first):
+                return events
+            event = pygame.event.wait(wait_ms)
+            if event.type != pygame.NOEVENT:
+                event.timestamp = time.perf_counter()
+                events.append(event)
+
+    def get_time(self) -> float:
+        """Seconds to advance the frame by."""
+        return 0 if self.idle else self.elapsed
+
+
+class DynamicResolution:
+    """Picks the render scale from ``scales`` by the recent frame times.
+
+    The scale goes a step down when the mean time of the last ``window``
+    frames is over ``budget``, and a step up when the estimated time at the
+    next scale, which draws more pixels, is within ``headroom`` of it. A
+    step down that did not make frames faster is undone, and the scale
+    stays above it from then on; scaling the drawing up has a cost of its
+    own, which only pays off when drawing the pixels costs more.
+    """
+
+    def __init__(
+        self,
+        budget: float,
+        scales: list[float] = config.RENDER_SCALES,
+        window: int = config.DYNAMIC_RESOLUTION_WINDOW,
+        headroom: float = config.DYNAMIC_RESOLUTION_HEADROOM,
+    ) -> None:
+        self.budget = budget
+        self.scales = sorted(scales, reverse=True)
+        self.window = window
+        self.headroom = headroom
+        self.index = 0
+        self.lowest = len(self.scales) - 1
+        self.mean_before_step: Optional[float] = None
+        self.times: list[float] = []
+
+    def get_scale(self) -> float:
+        return self.scales[self.index]
+
+    def set_scale(self, scale: float) -> None:
+        self.index = min(
+            range(len(self.scales)), key=lambda i: abs(self.scales[i] - scale)
+        )
+        self.lowest = len(self.scales) - 1
+        self.mean_before_step = None
+        self.times = []
+
+    def update(self, frame_time: float) -> float:
+        """Record the work time of a frame and return the scale to draw at."""
+        self.times.append(frame_time)
+        if len(self.times) < self.window:
+            return self.get_scale()
+        mean = sum(self.times) / len(self.times)
+        self.times = []
+        mean_before_step = self.mean_before_step
+        self.mean_before_step = None
+        if mean_before_step is not None and mean >= mean_before_step:
+            self.index -= 1
+            self.lowest = self.index
+        elif mean > self.budget and self.index < self.lowest:
+            self.index += 1
+            self.mean_before_step = mean
+        elif self.index > 0:
+            pixels = (self.scales[self.index - 1] / self.get_scale()) ** 2
+            if mean * pixels < self.budget * self.headroom:
+                self.index -= 1
+        return self.get_scale()
@@ -0,0 +1,134 @@
+import cProfile
+import csv
+import heapq
+import os
+import time
+from typing import Optional
+import config
+
+
+class StartupProfile:
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.last = start
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self) -> str:
+        width = max([len("time to first frame")] + [len(v) for v, _ in self.phases])
+        lines = [f"{phase:<{width}}  {t * 1000:8.1f} ms" for phase, t in self.phases]
+        total = self.last - self.start
+        lines.append(f"{'time to first frame':<{width}}  {total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+
+class FrameProfiler:
+    """Times the phases of every frame of the main loop.
+
+    The last ``window`` frames of each phase are kept in ring buffers for
+    rolling percentiles. Every frame can also be written to a CSV file, and
+    the slowest ``capture_slowest`` frames are kept as cProfile captures.
+    """
+
+    def __init__(
+        self,
+        phases: list[str],
+        window: int = config.FRAME_PROFILE_WINDOW,
+        csv_path: Optional[str] = None,
+        capture_slowest: int = 0,
+    ) -> None:
+        self.phases = phases
+        self.columns = phases + ["frame"]
+        self.window = window
+        self.samples = {v: [0] * window for v in self.columns}
+        self.frames = 0
+        self.show_hud = False
+        self.hud_lines: tuple[str, ...] = ()
+        self.hud_time = 0
+        self.current = dict.fromkeys(phases, 0)
+        self.frame_start = self.last = time.perf_counter_ns()
+
+        self.csv_file = None
+        if csv_path:
+            self.csv_file = open(csv_path, "w", newline="")
+            self.csv_writer = csv.writer(self.csv_file)
+            self.csv_writer.writerow(
+                ["index", "start_ns"] + [v + "_ns" for v in self.columns]
+            )
+
+        self.capture_slowest = capture_slowest
+        self.slowest: list[tuple[int, int, cProfile.Profile]] = []
+        self.capture: Optional[cProfile.Profile] = None
+
+    def begin_frame(self) -> None:
+        if self.capture_slowest:
+            self.capture = cProfile.Profile()
+            self.capture.enable()
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter_ns()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self) -> None:
+        if self.capture:
+            self.capture.disable()
+        total = self.last - self.frame_start
+        i = self.frames % self.window
+        for phase in self.phases:
+            self.samples[phase][i] = self.current[phase]
+            self.current[phase] = 0
+        self.samples["frame"][i] = total
+        if self.csv_file:
+            row = [self.frames, self.frame_start]
+            self.csv_writer.writerow(row + [self.samples[v][i] for v in self.columns])
+        if self.capture:
+            entry = (total, self.frames, self.capture)
+            if len(self.slowest) < self.capture_slowest:
+                heapq.heappush(self.slowest, entry)
+            elif total > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+            self.capture = None
+        self.frames += 1
+        if self.show_hud and self.last - self.hud_time > config.FRAME_HUD_REFRESH * 1e9:
+            self.hud_lines = self.get_report_lines()
+            self.hud_time = self.last
+
+    def get_percentiles(self, column: str) -> tuple[float, float, float]:
+        """p50, p95 and p99 of the recent frames in milliseconds."""
+        n = min(self.frames, self.window)
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        values = sorted(self.samples[column][:n])
+        return tuple(values[round(q * (n - 1))] / 1e6 for q in (0.5, 0.95, 0.99))
+
+    def get_report_lines(self) -> tuple[str, ...]:
+        width = max(len(v) for v in self.columns)
+        lines = [f"{'ms':<{width}}  {'p50':>6} {'p95':>6} {'p99':>6}"]
+        for column in self.columns:
+            p50, p95, p99 = self.get_percentiles(column)
+            lines.append(f"{column:<{width}}  {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        return tuple(lines)
+
+    def toggle_hud(self) -> None:
+        self.show_hud = not self.show_hud
+        self.hud_lines = self.get_report_lines()
+        self.hud_time = self.last
+
+    def close(self, directory: str = ".") -> list[str]:
+        """Finish the CSV file and save the captured frames, slowest first."""
+        if self.csv_file:
+            self.csv_file.close()
+            self.csv_file = None
+        paths = []
+        for total, index, capture in sorted(self.slowest, reverse=True):
+            path = os.path.join(directory, f"frame-{index}-{total // 1000}us.prof")
+            capture.dump_stats(path)
+            paths.append(path)
+        self.slowest = []
+        return paths
@@ -0,0 +1,236 @@
+import asyncio
+import struct
+from collections import deque
+from typing import Optional
+import game
+from replay import read_varint, write_varint
+
+# Every message is a varint length followed by a one byte type.
+JOIN = ord("J")  # varint room
+ORIENTATION = ord("O")  # u8 SnakeOrientation value
+SNAPSHOT = ord("S")
+DELTA = ord("D")
+
+# Flags of a delta, followed by their data in this order.
+DELTA_SNAKE = 1
+DELTA_LENGTH = 2
+DELTA_FOODS = 4
+DELTA_END = 8
+
+POINT = struct.Struct("<ffB")
+FOOD = struct.Struct("<ffB")
+TAIL = struct.Struct("<ff")
+
+# The head is looked for this far from the front; more turns in one tick
+# than this are sent as a snapshot.
+MAX_DELTA_TURNS = 8
+
+
+def encode_message(payload: bytes) -> bytes:
+    data = bytearray()
+    write_varint(data, len(payload))
+    return bytes(data + payload)
+
+
+async def read_message(reader: asyncio.StreamReader, max_size: int) -> bytes:
+    size = 0
+    shift = 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        size |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    if not 0 < size <= max_size:
+        raise ValueError(f"bad message size {size}")
+    return await reader.readexactly(size)
+
+
+def encode_join(room: int) -> bytes:
+    data = bytearray([JOIN])
+    write_varint(data, room)
+    return encode_message(data)
+
+
+def encode_orientation(orientation: game.SnakeOrientation) -> bytes:
+    return encode_message(bytes([ORIENTATION, orientation.value]))
+
+
+class StateTracker:
+    """Encodes what changed in a game since the last delta.
+
+    Between ticks only the head, the tail and the list ends change, so a
+    delta holds the key points added at the front, the number trimmed from
+    the back, the new tail position and the foods eaten and spawned.
+    Anything a delta cannot describe, like a reset game, becomes a snapshot.
+    """
+
+    def __init__(self, manager: game.GameManager) -> None:
+        self.manager = manager
+        self.mark()
+
+    def mark(self) -> None:
+        manager = self.manager
+        key_points = manager.snake.key_points
+        self.head = key_points[0]
+        self.head_x = self.head.x
+        self.head_y = self.head.y
+        self.count = len(key_points)
+        self.foods = list(manager.foods)
+        self.length = manager.snake.length
+        self.state = manager.snake.state
+        self.end = manager.end
+
+    def encode_snapshot(self, tick: int) -> bytes:
+        manager = self.manager
+        data = bytearray([SNAPSHOT])
+        for value in [
+            tick,
+            manager.width,
+            manager.height,
+            manager.snake.length,
+            manager.snake.state.value,
+            manager.end,
+            len(manager.snake.key_points),
+        ]:
+            write_varint(data, value)
+        for k in manager.snake.key_points:
+            data += POINT.pack(k.x, k.y, k.orientation.value)
+        write_varint(data, len(manager.foods))
+        for food in manager.foods:
+            data += FOOD.pack(food.x, food.y, food.type.value)
+        return encode_message(data)
+
+    def encode_delta(self, tick: int) -> Optional[bytes]:
+        """Return the changes since the last call, or None if there are none."""
+        manager = self.manager
+        key_points = manager.snake.key_points
+        turns = next(
+            (
+                i
+                for i in range(min(MAX_DELTA_TURNS + 1, len(key_points)))
+                if key_points[i] is self.head
+            ),
+            None,
+        )
+        if turns is None or self.count + turns < len(key_points):
+            data = self.encode_snapshot(tick)
+            self.mark()
+            return data
+
+        popped = self.count + turns - len(key_points)
+        flags = 0
+        body = bytearray()
+        head = key_points[0]
+        if turns or popped or (head.x, head.y) != (self.head_x, self.head_y):
+            flags |= DELTA_SNAKE
+            write_varint(body, turns)
+            for i in range(turns + 1):
+                k = key_points[i]
+                body += POINT.pack(k.x, k.y, k.orientation.value)
+            write_varint(body, popped)
+            body += TAIL.pack(key_points[-1].x, key_points[-1].y)
+        snake = manager.snake
+        if snake.length != self.length or snake.state != self.state:
+            flags |= DELTA_LENGTH
+            write_varint(body, snake.length)
+            body.append(snake.state.value)
+        if manager.foods != self.foods:
+            flags |= DELTA_FOODS
+            removed = [i for i, v in enumerate(self.foods) if v not in manager.foods]
+            added = [v for v in manager.foods if v not in self.foods]
+            write_varint(body, len(removed))
+            for i in removed:
+                write_varint(body, i)
+            write_varint(body, len(added))
+            for food in added:
+                body += FOOD.pack(food.x, food.y, food.type.value)
+        if manager.end != self.end:
+            flags |= DELTA_END
+            body.append(manager.end)
+        self.mark()
+        if not flags:
+            return None
+        data = bytearray([DELTA])
+        write_varint(data, tick)
+        data.append(flags)
+        return encode_message(data + body)
+
+
+class Mirror:
+    """A client's copy of a game, kept up to date from snapshots and deltas.
+
+    Key points and foods are ``[x, y, value]`` lists, ordered like the game's.
+    """
+
+    def __init__(self) -> None:
+        self.tick = 0
+        self.width = 0
+        self.height = 0
+        self.length = 0
+        self.state = 0
+        self.end = 0
+        self.key_points: deque[list] = deque()
+        self.foods: list[list] = []
+
+    def apply(self, payload: bytes) -> None:
+        if payload[0] == SNAPSHOT:
+            self.apply_snapshot(payload)
+        elif payload[0] == DELTA:
+            self.apply_delta(payload)
+        else:
+            raise ValueError(f"unknown message type {payload[0]}")
+
+    def apply_snapshot(self, data: bytes) -> None:
+        pos = 1
+        values = []
+        for _ in range(7):
+            value, pos = read_varint(data, pos)
+            values.append(value)
+        self.tick, self.width, self.height, self.length, self.state, self.end, count = (
+            values
+        )
+        self.key_points = deque()
+        for _ in range(count):
+            self.key_points.append(list(POINT.unpack_from(data, pos)))
+            pos += POINT.size
+        count, pos = read_varint(data, pos)
+        self.foods = []
+        for _ in range(count):
+            self.foods.append(list(FOOD.unpack_from(data, pos)))
+            pos += FOOD.size
+
+    def apply_delta(self, data: bytes) -> None:
+        self.tick, pos = read_varint(data, 1)
+        flags = data[pos]
+        pos += 1
+        if flags & DELTA_SNAKE:
+            turns, pos = read_varint(data, pos)
+            points = []
+            for _ in range(turns + 1):
+                points.append(list(POINT.unpack_from(data, pos)))
+                pos += POINT.size
+            self.key_points.popleft()
+            self.key_points.extendleft(reversed(points))
+            popped, pos = read_varint(data, pos)
+            for _ in range(popped):
+                self.key_points.pop()
+            self.key_points[-1][:2] = TAIL.unpack_from(data, pos)
+            pos += TAIL.size
+        if flags & DELTA_LENGTH:
+            self.length, pos = read_varint(data, pos)
+            self.state = data[pos]
+            pos += 1
+        if flags & DELTA_FOODS:
+            count, pos = read_varint(data, pos)
+            removed = set()
+            for _ in range(count):
+                i, pos = read_varint(data, pos)
+                removed.add(i)
+            self.foods = [v for i, v in enumerate(self.foods) if i not in removed]
+            count, pos = read_varint(data, pos)
+            for _ in range(count):
+                self.foods.append(list(FOOD.unpack_from(data, pos)))
+                pos += FOOD.size
+        if flags & DELTA_END:
+            self.end = data[pos]
@@ -0,0 +1,278 @@
+import argparse
+import bisect
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+import config
+import game
+import timestep
+
+MAGIC = b"PSNR"
+VERSION = 1
+
+
+class Recording:
+    """A game as its seed and the orientations asked for at each tick.
+
+    Inputs are applied before the tick with the same number runs, which is
+    what the launcher does with the keys it handles between frames.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        width: int = config.GAME_WIDTH,
+        height: int = config.GAME_HEIGHT,
+        tick_rate: int = config.SIMULATION_TICK_RATE,
+        max_substep_distance: float = config.MAX_SUBSTEP_DISTANCE,
+    ) -> None:
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.tick_rate = tick_rate
+        self.max_substep_distance = max_substep_distance
+        self.inputs: list[tuple[int, game.SnakeOrientation]] = []
+        self.ticks = 0
+        self.score = 0
+        self.end = 0
+
+    def add_input(self, tick: int, orientation: game.SnakeOrientation) -> None:
+        self.inputs.append((tick, orientation))
+
+    def finish(self, ticks: int, score: int, end: int) -> None:
+        self.ticks = ticks
+        self.score = score
+        self.end = end
+
+    def to_bytes(self) -> bytes:
+        data = bytearray(MAGIC)
+        for value in [
+            VERSION,
+            self.seed,
+            self.width,
+            self.height,
+            self.tick_rate,
+            self.ticks,
+            self.score,
+            self.end,
+            len(self.inputs),
+        ]:
+            write_varint(data, value)
+        data += struct.pack("<d", self.max_substep_distance)
+        last = 0
+        for tick, _ in self.inputs:
+            write_varint(data, tick - last)
+            last = tick
+        # Four 2-bit orientations per byte.
+        for i in range(0, len(self.inputs), 4):
+            byte = 0
+            for j, (_, orientation) in enumerate(self.inputs[i : i + 4]):
+                byte |= orientation.value << (j * 2)
+            data.append(byte)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Recording":
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError("not a replay file")
+        pos = len(MAGIC)
+        values = []
+        for _ in range(9):
+            value, pos = read_varint(data, pos)
+            values.append(value)
+        version, seed, width, height, tick_rate, ticks, score, end, count = values
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        (max_substep_distance,) = struct.unpack_from("<d", data, pos)
+        pos += 8
+        recording = cls(seed, width, height, tick_rate, max_substep_distance)
+        recording.finish(ticks, score, end)
+        ticks = []
+        tick = 0
+        for _ in range(count):
+            delta, pos = read_varint(data, pos)
+            tick += delta
+            ticks.append(tick)
+        if len(data) < pos + (count + 3) // 4:
+            raise ValueError("truncated replay file")
+        for i, tick in enumerate(ticks):
+            value = data[pos + i // 4] >> (i % 4 * 2) & 3
+            recording.add_input(tick, game.SnakeOrientation(value))
+        return recording
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def save_to_dir(recording: Recording, directory: str = config.REPLAY_DIR) -> str:
+    """Save a finished recording under a name made of its time and score."""
+    os.makedirs(directory, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S") + f"-{recording.score}.replay"
+    path = os.path.join(directory, name)
+    recording.save(path)
+    return path
+
+
+def write_varint(data: bytearray, value: int) -> None:
+    if value < 0:
+        raise ValueError("varints must not be negative")
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("truncated replay file")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Keyframe(NamedTuple):
+    tick: int
+    input_index: int
+    manager: game.GameManager
+
+
+class Verification(NamedTuple):
+    ok: bool
+    score: int
+    end: int
+    ticks: int
+
+
+class Replay:
+    """Re-simulates a recording without a display.
+
+    Playing through a recording stores a copy of the game every
+    ``keyframe_interval`` ticks, so seek only replays from the nearest one.
+    """
+
+    def __init__(
+        self,
+        recording: Recording,
+        keyframe_interval: int = config.REPLAY_KEYFRAME_INTERVAL,
+    ) -> None:
+        self.recording = recording
+        self.keyframe_interval = keyframe_interval
+        self.keyframes: list[Keyframe] = []
+        self.rewind()
+
+    def rewind(self) -> None:
+        recording = self.recording
+        self.manager = game.GameManager(recording.width, recording.height)
+        self.manager.reset_game(recording.seed)
+        self.input_index = 0
+        self.simulation = timestep.FixedTimestep(
+            self.manager, recording.tick_rate, recording.max_substep_distance
+        )
+
+    def load_keyframe(self, keyframe: Keyframe) -> None:
+        self.manager = keyframe.manager.clone()
+        self.input_index = keyframe.input_index
+        self.simulation = timestep.FixedTimestep(
+            self.manager,
+            self.recording.tick_rate,
+            self.recording.max_substep_distance,
+        )
+        self.simulation.ticks = keyframe.tick
+
+    def play(self, until: Optional[int] = None) -> game.GameManager:
+        """Run up to the given tick, the end of the recording or the snake's death."""
+        until = self.recording.ticks if until is None else until
+        inputs = self.recording.inputs
+        simulation = self.simulation
+        tick_time = simulation.tick
+        while simulation.ticks < until and self.manager.end == 0:
+            if simulation.ticks % self.keyframe_interval == 0:
+                self.add_keyframe()
+            while (
+                self.input_index < len(inputs)
+                and inputs[self.input_index][0] <= simulation.ticks
+            ):
+                self.manager.set_snake_orientation(inputs[self.input_index][1])
+                self.input_index += 1
+            simulation.step(tick_time)
+            simulation.ticks += 1
+        return self.manager
+
+    def add_keyframe(self) -> None:
+        tick = self.simulation.ticks
+        if self.keyframes and self.keyframes[-1].tick >= tick:
+            return
+        manager = self.manager.clone()
+        self.keyframes.append(Keyframe(tick, self.input_index, manager))
+
+    def seek(self, tick: int) -> game.GameManager:
+        """Return the game as it was right before the given tick ran."""
+        i = bisect.bisect_right([k.tick for k in self.keyframes], tick) - 1
+        position = self.simulation.ticks
+        if i >= 0 and not self.keyframes[i].tick <= position <= tick:
+            self.load_keyframe(self.keyframes[i])
+        elif i < 0 and position > tick:
+            self.rewind()
+        return self.play(tick)
+
+    def verify(self) -> Verification:
+        """Play the whole recording and compare the result with the claimed one."""
+        self.rewind()
+        manager = self.play()
+        ticks = self.simulation.ticks
+        ok = (
+            manager.get_score() == self.recording.score
+            and manager.end == self.recording.end
+            and ticks == self.recording.ticks
+        )
+        return Verification(ok, manager.get_score(), manager.end, ticks)
+
+
+def verify_file(path: str) -> tuple[bool, str]:
+    try:
+        recording = Recording.load(path)
+    except (OSError, ValueError) as e:
+        return False, f"{path}: {e}"
+    result = Replay(recording).verify()
+    status = "ok" if result.ok else "MISMATCH"
+    return result.ok, (
+        f"{path}: {status}  claimed {recording.score}"
+        f"  replayed {result.score} in {result.ticks} ticks"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="verify pysnake replays")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes (default: all CPUs)",
+    )
+    args = parser.parse_args()
+    failed = 0
+    with ProcessPoolExecutor(args.jobs) as pool:
+        for ok, line in pool.map(verify_file, args.files):
+            print(line)
+            failed += not ok
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
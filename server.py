@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import deque
+import config
+import game
+import protocol
+import timestep
+
+# Client messages are a join or an orientation, both only a few bytes.
+MAX_CLIENT_MESSAGE = 16
+
+
+class Room:
+    """One authoritative game that every client in the room can steer.
+
+    Orientations are queued as they arrive and applied before the next tick,
+    after which the changes are sent to all clients as a single delta.
+    """
+
+    def __init__(self, id: int, tick_rate: int) -> None:
+        self.id = id
+        self.manager = game.GameManager(
+            config.GAME_WIDTH, config.GAME_HEIGHT, random.getrandbits(64)
+        )
+        self.simulation = timestep.FixedTimestep(self.manager, tick_rate)
+        self.tracker = protocol.StateTracker(self.manager)
+        self.clients: set[asyncio.StreamWriter] = set()
+        self.inputs: list[game.SnakeOrientation] = []
+        self.restart_ticks = round(config.SERVER_RESTART_DELAY * tick_rate)
+        self.end_tick = 0
+
+    def join(self, client: asyncio.StreamWriter) -> None:
+        self.clients.add(client)
+        client.write(self.tracker.encode_snapshot(self.simulation.ticks))
+
+    def tick(self) -> None:
+        simulation = self.simulation
+        manager = self.manager
+        for orientation in self.inputs:
+            manager.set_snake_orientation(orientation)
+        self.inputs.clear()
+        if manager.end == 0:
+            simulation.step(simulation.tick)
+        elif simulation.ticks - self.end_tick >= self.restart_ticks:
+            manager.reset_game(random.getrandbits(64))
+        simulation.ticks += 1
+        if manager.end and not self.tracker.end:
+            self.end_tick = simulation.ticks
+        data = self.tracker.encode_delta(simulation.ticks)
+        if data:
+            self.broadcast(data)
+
+    def broadcast(self, data: bytes) -> None:
+        for client in list(self.clients):
+            if (
+                client.transport.get_write_buffer_size()
+                > config.SERVER_MAX_WRITE_BUFFER
+            ):
+                # Too slow to keep up; it would only fall further behind.
+                self.clients.discard(client)
+                client.close()
+            else:
+                client.write(data)
+
+
+class Server:
+    """Hosts any number of rooms and ticks all of them from one loop."""
+
+    def __init__(self, tick_rate: int = config.SERVER_TICK_RATE) -> None:
+        self.tick_rate = tick_rate
+        self.rooms: dict[int, Room] = {}
+        window = round(config.SERVER_STATS_INTERVAL * tick_rate)
+        self.tick_times: deque[float] = deque(maxlen=window)
+        self.late_ticks = 0
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        room = None
+        try:
+            message = await protocol.read_message(reader, MAX_CLIENT_MESSAGE)
+            if message[0] != protocol.JOIN:
+                raise ValueError("expected a join message")
+            room_id, _ = protocol.read_varint(message, 1)
+            room = self.rooms.get(room_id) or Room(room_id, self.tick_rate)
+            self.rooms[room_id] = room
+            room.join(writer)
+            while True:
+                message = await protocol.read_message(reader, MAX_CLIENT_MESSAGE)
+                if message[0] != protocol.ORIENTATION or len(message) != 2:
+                    raise ValueError("expected an orientation message")
+                room.inputs.append(game.SnakeOrientation(message[1]))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            if room:
+                room.clients.discard(writer)
+                if not room.clients and self.rooms.get(room.id) is room:
+                    del self.rooms[room.id]
+            writer.close()
+
+    async def run_ticks(self) -> None:
+        """Tick every room on a fixed schedule.
+
+        A late tick does not make the following ones run early to catch up,
+        so a single slow tick delays the game instead of bunching deltas.
+        """
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            start = time.perf_counter()
+            for room in list(self.rooms.values()):
+                room.tick()
+            self.tick_times.append(time.perf_counter() - start)
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                next_tick = loop.time()
+            await asyncio.sleep(max(0, delay))
+
+    async def print_stats(self) -> None:
+        while True:
+            await asyncio.sleep(config.SERVER_STATS_INTERVAL)
+            if not self.tick_times:
+                continue
+            times = sorted(self.tick_times)
+            p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+            clients = sum(len(v.clients) for v in self.rooms.values())
+            print(
+                f"rooms {len(self.rooms)}  clients {clients}"
+                f"  tick median {statistics.median(times) * 1000:.2f} ms"
+                f"  p99 {p99 * 1000:.2f} ms  late ticks {self.late_ticks}",
+                flush=True,
+            )
+
+    async def serve(self, host: str, port: int, stats: bool = True) -> None:
+        server = await asyncio.start_server(self.handle_client, host, port)
+        tasks = [self.run_ticks()]
+        if stats:
+            tasks.append(self.print_stats())
+        async with server:
+            await asyncio.gather(server.serve_forever(), *tasks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="pysnake multiplayer room server")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument(
+        "--tick-rate",
+        type=int,
+        default=config.SERVER_TICK_RATE,
+        help="ticks per second of every room",
+    )
+    parser.add_argument("--quiet", action="store_true", help="do not print stats")
+    args = parser.parse_args()
+    try:
+        asyncio.run(Server(args.tick_rate).serve(args.host, args.port, not args.quiet))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import random
+import pytest
+import game
+
+np = pytest.importorskip("numpy")
+import batch
+
+
+def test_batch_follows_the_scalar_rules():
+    n = 16
+    rng = random.Random(0)
+    managers = [game.GameManager(30, 30, i) for i in range(n)]
+    games = batch.BatchGameManager(n, 30, 30, seed=0)
+    for i, manager in enumerate(managers):
+        manager.foods = [
+            game.Food(
+                rng.uniform(12, 18),
+                rng.uniform(12, 18),
+                rng.choice(list(game.FoodType)),
+            )
+            for _ in range(batch.MAX_FOODS)
+        ]
+        games.food_x[i] = [food.x for food in manager.foods]
+        games.food_y[i] = [food.y for food in manager.foods]
+        games.food_type[i] = [food.type.value for food in manager.foods]
+        games.food_count[i] = len(manager.foods)
+    orientations = list(game.SnakeOrientation)
+    for _ in range(1200):
+        # Foods spawn from different random streams, so none spawn here.
+        games.food_time[:] = -1e9
+        actions = np.full(n, batch.NO_ACTION)
+        for i, manager in enumerate(managers):
+            manager.food_time = -1e9
+            if rng.random() < 0.15:
+                orientation = rng.choice(orientations)
+                actions[i] = orientation.value
+                manager.set_snake_orientation(orientation)
+            manager.update(1 / 60)
+        games.step(actions, 1 / 60)
+
+        x, y, o = games.get_key_points()
+        for i, manager in enumerate(managers):
+            snake = manager.snake
+            count = games.count[i]
+            assert count == len(snake.key_points)
+            assert list(x[i, :count]) == pytest.approx([k.x for k in snake.key_points])
+            assert list(y[i, :count]) == pytest.approx([k.y for k in snake.key_points])
+            assert list(o[i, :count]) == [k.orientation.value for k in snake.key_points]
+            assert games.length[i] == snake.length
+            assert games.state[i] == snake.state.value
+            assert games.end[i] == manager.end
+            assert games.food_count[i] == len(manager.foods)
+            foods = manager.foods
+            assert list(games.food_x[i, : len(foods)]) == pytest.approx(
+                [f.x for f in foods]
+            )
+    # Both kinds of deaths and some eating happened.
+    assert {1, 2} <= set(games.end.tolist())
+    assert (games.get_score() > 0).any()
@@ -0,0 +1,63 @@
+import math
+import random
+from itertools import islice
+import pytest
+import game
+import tournament
+
+
+def play(manager: game.GameManager, steps: int = 2000) -> list[tuple]:
+    policy = tournament.make_random_policy(1)
+    states = []
+    for _ in range(steps):
+        orientation = policy(manager)
+        if orientation is not None:
+            manager.set_snake_orientation(orientation)
+        manager.update(1 / 60)
+        head = manager.snake.key_points[0]
+        states.append((head.x, head.y, [(f.x, f.y) for f in manager.foods]))
+    return states
+
+
+def test_clone_and_restore_play_the_same_game():
+    manager = game.GameManager(30, 30, 1)
+    manager.set_snake_orientation(game.SnakeOrientation.UP)
+    play(manager, 300)
+    clone = manager.clone()
+    snapshot = manager.snapshot()
+    expected = play(manager)
+    manager.restore(snapshot)
+    assert play(manager) == expected
+    manager.restore(snapshot)
+    assert play(manager) == expected
+    assert play(clone) == expected
+
+
+def test_free_mass_follows_the_body():
+    manager = game.GameManager(20, 20, 2)
+    manager.set_snake_orientation(game.SnakeOrientation.UP)
+    policy = tournament.make_random_policy(3, 0.05)
+    for _ in range(3000):
+        orientation = policy(manager)
+        if orientation is not None:
+            manager.set_snake_orientation(orientation)
+        manager.update(1 / 60)
+        if manager.end:
+            break
+        grid = manager.snake.segment_grid
+        if grid.free_mass is not None:
+            fresh = manager.food_spawner.get_free_mass(grid.covered)
+            assert grid.free_mass.covered_counts == fresh.covered_counts
+            assert grid.free_mass.full_rows == fresh.full_rows
+            assert grid.free_mass.tree == pytest.approx(fresh.tree)
+
+
+def test_food_positions_skip_covered_cells():
+    spawner = game.FoodSpawner(0, 9, 0, 9, random.Random(1))
+    grid = game.SegmentGrid()
+    grid.covered = {(i, j): 1 for i in range(9) for j in range(9) if i != j}
+    for x, y in islice(spawner.positions(grid), 500):
+        assert math.floor(x) == math.floor(y)
+    grid.covered = {(i, j): 1 for i in range(9) for j in range(9)}
+    grid.free_mass = None
+    assert spawner.positions(grid) is None
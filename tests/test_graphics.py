@@ -0,0 +1,68 @@
+from itertools import chain
+import pygame
+import pytest
+import autopilot
+import game
+import graphics
+import timestep
+
+
+def play_under_score(frames: int = 90):
+    """Yield a game and its render snake every frame while the snake crawls
+    along the top row, under the score."""
+    manager = game.GameManager(50, 50, 1)
+    manager.snake.reset(31, 1.2)
+    manager.set_snake_orientation(game.SnakeOrientation.LEFT)
+    simulation = timestep.FixedTimestep(manager)
+    for _ in range(frames):
+        simulation.advance(1 / 30)
+        yield manager, simulation.get_render_snake()
+
+
+def play_autopilot(board: int, frames: int = 400):
+    """Yield a game the autopilot plays, which eats and changes the score,
+    and its render snake every frame."""
+    manager = game.GameManager(board, board, 2)
+    simulation = timestep.FixedTimestep(manager)
+    pilot = autopilot.Autopilot(node_budget=100)
+    simulation.controller = pilot.steer
+    for _ in range(frames):
+        pilot.plan(manager)
+        simulation.advance(1 / 20)
+        yield manager, simulation.get_render_snake()
+
+
+def assert_same(surface: pygame.Surface, expected: pygame.Surface) -> None:
+    assert pygame.image.tobytes(surface, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+
+@pytest.mark.parametrize("board", [30, 80])
+def test_game_renderer_matches_draw_game(board):
+    surface = pygame.Surface((750, 750))
+    expected = pygame.Surface((750, 750))
+    renderer = graphics.GameRenderer()
+    camera = graphics.Camera()
+    scores = set()
+    frames = chain(play_under_score(), play_autopilot(board))
+    for i, (manager, snake) in enumerate(frames):
+        if i == 90:
+            # The autopilot's game is new.
+            renderer.invalidate()
+        head = snake.key_points[0]
+        camera.follow(head.x, head.y, manager.width, manager.height)
+        renderer.draw(surface, manager, snake, camera)
+        graphics.draw_game(expected, manager, True, snake, camera)
+        assert_same(surface, expected)
+        scores.add(manager.get_score())
+    assert len(scores) > 1
+
+
+@pytest.mark.parametrize("scale", [0.5, 0.6, 0.75])
+def test_scaled_renderer_matches_full_render(scale):
+    surface = pygame.Surface((750, 750))
+    expected = pygame.Surface((750, 750))
+    renderer = graphics.ScaledRenderer(scale)
+    for manager, snake in play_under_score():
+        renderer.draw(surface, manager, snake)
+        graphics.ScaledRenderer(scale).draw(expected, manager, snake)
+        assert_same(surface, expected)
@@ -0,0 +1,67 @@
+import pytest
+import autopilot
+import game
+import replay
+import timestep
+
+
+def record_game(seed: int, ticks: int = 3000) -> replay.Recording:
+    """Play a game with the autopilot, recording its turns like the launcher."""
+    recording = replay.Recording(seed, 30, 30)
+    manager = game.GameManager(30, 30, seed)
+    simulation = timestep.FixedTimestep(
+        manager, recording.tick_rate, recording.max_substep_distance
+    )
+    pilot = autopilot.Autopilot(node_budget=100)
+    while simulation.ticks < ticks and manager.end == 0:
+        orientation = pilot(manager)
+        if orientation is not None:
+            manager.set_snake_orientation(orientation)
+            recording.add_input(simulation.ticks, orientation)
+        simulation.step(simulation.tick)
+        simulation.ticks += 1
+    recording.finish(simulation.ticks, manager.get_score(), manager.end)
+    return recording
+
+
+def test_bytes_round_trip():
+    recording = replay.Recording(2**63 + 5, 40, 30)
+    # Gaps of one to three varint bytes, and a count that is not a multiple
+    # of the four orientations per byte.
+    for i, tick in enumerate([0, 1, 200, 201, 40000, 40001, 40129]):
+        recording.add_input(tick, game.SnakeOrientation(i % 4))
+    recording.finish(50000, 17, 2)
+    data = recording.to_bytes()
+    loaded = replay.Recording.from_bytes(data)
+    assert vars(loaded) == vars(recording)
+    assert loaded.to_bytes() == data
+    with pytest.raises(ValueError):
+        replay.Recording.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        replay.Recording.from_bytes(b"XXXX" + data[4:])
+
+
+def test_verify_recorded_game():
+    recording = record_game(3)
+    assert recording.score > 0
+    recording = replay.Recording.from_bytes(recording.to_bytes())
+    result = replay.Replay(recording).verify()
+    assert result == (True, recording.score, recording.end, recording.ticks)
+    recording.score += 1
+    assert not replay.Replay(recording).verify().ok
+
+
+def test_seek_matches_playing_from_the_start():
+    recording = record_game(4)
+    seeking = replay.Replay(recording, keyframe_interval=100)
+    seeking.play()
+    for tick in [recording.ticks // 2, 150, recording.ticks - 1, 0]:
+        expected = replay.Replay(recording).play(tick)
+        manager = seeking.seek(tick)
+        assert seeking.simulation.ticks == tick
+        assert [(k.x, k.y) for k in manager.snake.key_points] == [
+            (k.x, k.y) for k in expected.snake.key_points
+        ]
+        assert [(f.x, f.y) for f in manager.foods] == [
+            (f.x, f.y) for f in expected.foods
+        ]
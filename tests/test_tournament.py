@@ -0,0 +1,11 @@
+import tournament
+
+
+def test_autopilot_games_are_reproducible():
+    first = tournament.play_batch("autopilot", range(2), 144 * 20, 1 / 144, 30, 30)
+    second = tournament.play_batch("autopilot", range(2), 144 * 20, 1 / 144, 30, 30)
+    assert first == second
+
+
+def test_summary_without_games():
+    assert tournament.Summary(1 / 144).get_report_lines() == ["games      0"]
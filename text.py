@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+from typing import Optional
+import pygame
+import config
+from cache import LRUCache
+
+font_cache: LRUCache[pygame.font.Font] = LRUCache(config.FONT_CACHE_SIZE)
+text_cache: LRUCache[pygame.Surface] = LRUCache(config.TEXT_CACHE_SIZE)
+resolved_fonts: Optional[dict[str, tuple[Optional[str], bool]]] = None
+
+
+def get_font_dirs() -> list[str]:
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        return [
+            os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+            os.path.join(
+                os.environ.get("LOCALAPPDATA", home), "Microsoft", "Windows", "Fonts"
+            ),
+        ]
+    if sys.platform == "darwin":
+        return [
+            "/System/Library/Fonts",
+            "/Library/Fonts",
+            os.path.join(home, "Library", "Fonts"),
+        ]
+    return [
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"),
+        os.path.join(home, ".local", "share", "fonts"),
+    ]
+
+
+def get_font_dirs_signature() -> list[list]:
+    signature = []
+    for path in get_font_dirs():
+        try:
+            signature.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            signature.append([path, None])
+    return signature
+
+
+def load_resolved_fonts() -> dict[str, tuple[Optional[str], bool]]:
+    try:
+        with open(config.FONT_RESOLUTION_CACHE_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["signature"] != get_font_dirs_signature():
+            return {}
+        return {k: (path, set_bold) for k, (path, set_bold) in data["fonts"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def save_resolved_fonts() -> None:
+    data = {"signature": get_font_dirs_signature(), "fonts": resolved_fonts}
+    try:
+        os.makedirs(os.path.dirname(config.FONT_RESOLUTION_CACHE_FILE), exist_ok=True)
+        with open(config.FONT_RESOLUTION_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError:
+        pass
+
+
+def capture_font_path(
+    path: Optional[str], size: int, set_bold: bool, set_italic: bool
+) -> tuple[Optional[str], bool]:
+    return path, set_bold
+
+
+def resolve_font(name: str, bold: bool) -> tuple[Optional[str], bool]:
+    """Return the font file SysFont would load and whether bold must be faked."""
+    global resolved_fonts
+    if resolved_fonts is None:
+        resolved_fonts = load_resolved_fonts()
+    key = f"{name}:{int(bold)}"
+    resolved = resolved_fonts.get(key)
+    if resolved is None or (resolved[0] and not os.path.exists(resolved[0])):
+        resolved = pygame.font.SysFont(name, 1, bold, constructor=capture_font_path)
+        resolved_fonts[key] = resolved
+        save_resolved_fonts()
+    return resolved
+
+
+def load_font(name: str, size: int, bold: bool) -> pygame.font.Font:
+    path, set_bold = resolve_font(name, bold)
+    font = pygame.font.Font(path, size)
+    if set_bold:
+        font.set_bold(True)
+    return font
+
+
+def get_font(
+    size: int, bold: bool = False, name: str = config.DEFAULT_TEXT_FONT_NAME
+) -> pygame.font.Font:
+    return font_cache.get((name, size, bold), lambda: load_font(name, size, bold))
+
+
+def render(
+    content: str,
+    size: int,
+    color: pygame.Color,
+    bold: bool = False,
+    name: str = config.DEFAULT_TEXT_FONT_NAME,
+) -> pygame.Surface:
+    """The returned surface is shared between callers and must not be modified."""
+    return text_cache.get(
+        (content, size, tuple(color), bold, name),
+        lambda: get_font(size, bold, name).render(content, True, color),
+    )
@@ -0,0 +1,117 @@
+import math
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Optional
+import config
+import game
+import headless
+import inputs
+
+
+class FixedTimestep:
+    """Advance a GameManager in fixed ticks, independent of the frame rate.
+
+    Each tick is split into sub-steps short enough that the snake moves at
+    most ``MAX_SUBSTEP_DISTANCE`` per update, so a slow frame can never make
+    it jump over its own body or a food. Rendering uses the state between the
+    last two ticks, see get_render_snake. A ``controller`` policy, if set,
+    is asked for a turn before every sub-step, and the turns of an ``inputs``
+    queue are applied before the ticks they are due at.
+    """
+
+    def __init__(
+        self,
+        manager: game.GameManager,
+        tick_rate: int = config.SIMULATION_TICK_RATE,
+        max_substep_distance: float = config.MAX_SUBSTEP_DISTANCE,
+    ) -> None:
+        self.manager = manager
+        self.tick = 1 / tick_rate
+        self.max_substep_distance = max_substep_distance
+        self.controller: Optional[headless.Policy] = None
+        self.inputs: Optional[inputs.InputQueue] = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.ticks = 0
+        self.accumulator = 0.0
+        self.previous: dict[int, tuple[game.SnakeKeyPoint, float, float]] = {}
+        self.views: dict[int, game.SnakeKeyPoint] = {}
+
+    def snapshot(self) -> None:
+        # Only the two key points at each end move during a tick.
+        key_points = self.manager.snake.key_points
+        ends = [key_points[0], key_points[-1]]
+        if len(key_points) >= 2:
+            ends += [key_points[1], key_points[-2]]
+        self.previous = {id(k): (k, k.x, k.y) for k in ends}
+
+    def step(self, dt: float) -> None:
+        distance = dt * self.manager.snake.get_speed()
+        substeps = max(1, math.ceil(distance / self.max_substep_distance))
+        for _ in range(substeps):
+            if self.controller:
+                orientation = self.controller(self.manager)
+                if orientation is not None:
+                    self.manager.set_snake_orientation(orientation)
+            self.manager.update(dt / substeps)
+
+    def advance(self, elapsed: float, now: Optional[float] = None) -> int:
+        """Run every tick that fits in the elapsed time and return their count.
+
+        The elapsed time ends at ``now``, by time.perf_counter, which places
+        the ticks in time for the ``inputs`` queue. Ticks stop once the game
+        has ended, so ``ticks`` is the game's length.
+        """
+        self.accumulator += min(elapsed, config.MAX_FRAME_TIME)
+        if now is None:
+            now = time.perf_counter()
+        ticks = 0
+        while self.manager.end == 0 and self.accumulator >= self.tick:
+            if self.inputs is not None:
+                self.inputs.apply(self.manager, self.ticks, now - self.accumulator)
+            self.snapshot()
+            self.step(self.tick)
+            self.accumulator -= self.tick
+            self.ticks += 1
+            ticks += 1
+        return ticks
+
+    def get_alpha(self) -> float:
+        return self.accumulator / self.tick
+
+    def get_render_snake(self) -> SimpleNamespace:
+        """Return a snake whose key points lie between the last two ticks.
+
+        Moved key points are replaced by view objects that persist while the
+        key point exists, so renderers can keep tracking them by identity.
+        ``views`` maps the ids of the replaced key points to their views, for
+        renderers that look segments up in ``segment_grid``.
+        """
+        alpha = self.get_alpha()
+        key_points = deque(self.manager.snake.key_points)
+        views = {}
+        for i in [0, 1, -2, -1]:
+            if not -len(key_points) <= i < len(key_points):
+                continue
+            k = key_points[i]
+            if id(k) in self.previous:
+                _, x, y = self.previous[id(k)]
+            elif i == 0 and len(key_points) >= 2 and id(key_points[1]) in self.previous:
+                # Inserted by a turn during the last tick, where the old head was.
+                _, x, y = self.previous[id(key_points[1])]
+            else:
+                continue
+            view = self.views.get(id(k)) or game.SnakeKeyPoint(x, y, k.orientation)
+            view.x = x + (k.x - x) * alpha
+            view.y = y + (k.y - y) * alpha
+            view.orientation = k.orientation
+            views[id(k)] = view
+            key_points[i] = view
+        self.views = views
+        return SimpleNamespace(
+            key_points=key_points,
+            segment_grid=self.manager.snake.segment_grid,
+            views=views,
+        )
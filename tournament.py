@@ -0,0 +1,218 @@
+import argparse
+import importlib
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, NamedTuple, Optional
+import autopilot
+import config
+import game
+import headless
+
+PolicyFactory = Callable[[int], headless.Policy]
+
+# Games per task for each worker when no chunk size is given. Several tasks
+# per worker balance the load, few enough keep IPC out of short games.
+TASKS_PER_WORKER = 4
+MAX_CHUNK_SIZE = 256
+
+
+def make_autopilot(seed: int) -> headless.Policy:
+    # A time budget would make the games depend on the machine's load.
+    return autopilot.Autopilot(node_budget=config.AUTOPILOT_NODE_BUDGET)
+
+
+def make_random_policy(seed: int, turn_chance: float = 0.02) -> headless.Policy:
+    rng = random.Random(seed)
+    orientations = list(game.SnakeOrientation)
+
+    def policy(manager: game.GameManager) -> Optional[game.SnakeOrientation]:
+        if rng.random() < turn_chance:
+            return rng.choice(orientations)
+        return None
+
+    return policy
+
+
+POLICIES: dict[str, PolicyFactory] = {
+    "autopilot": make_autopilot,
+    "random": make_random_policy,
+}
+
+
+def get_policy_factory(name: str) -> PolicyFactory:
+    """Look up a built-in policy or import one given as ``module:function``.
+
+    The function is called with the seed of every game and returns its policy.
+    """
+    if name in POLICIES:
+        return POLICIES[name]
+    module, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError(f"unknown policy {name!r}")
+    return getattr(importlib.import_module(module), attr)
+
+
+class GameResult(NamedTuple):
+    seed: int
+    score: int
+    end: int
+    steps: int
+    foods: tuple[int, ...]
+
+
+def play_batch(
+    policy: str,
+    seeds: range,
+    steps: int,
+    dt: float,
+    width: int,
+    height: int,
+) -> list[tuple]:
+    """Play the games of one task; results travel back as plain tuples."""
+    factory = get_policy_factory(policy)
+    results = []
+    for seed in seeds:
+        r = headless.run(factory(seed), seed, steps, dt, width, height)
+        results.append((seed, r.score, r.end, r.steps, r.foods))
+    return results
+
+
+def get_chunk_size(games: int, workers: int) -> int:
+    return max(1, min(MAX_CHUNK_SIZE, games // (workers * TASKS_PER_WORKER)))
+
+
+class Summary:
+    """Aggregates game results as they arrive."""
+
+    def __init__(self, dt: float) -> None:
+        self.dt = dt
+        self.scores: list[int] = []
+        self.steps: list[int] = []
+        self.ends = [0, 0, 0]
+        self.foods = [0] * len(game.FoodType)
+        self.best: Optional[GameResult] = None
+
+    def add(self, result: GameResult) -> None:
+        self.scores.append(result.score)
+        self.steps.append(result.steps)
+        self.ends[result.end] += 1
+        for i, count in enumerate(result.foods):
+            self.foods[i] += count
+        if self.best is None or result.score > self.best.score:
+            self.best = result
+
+    def get_report_lines(self) -> list[str]:
+        scores = self.scores
+        if not scores:
+            return ["games      0"]
+        survival = [steps * self.dt for steps in self.steps]
+        deciles = statistics.quantiles(scores, n=10) if len(scores) > 1 else scores * 9
+        lines = [
+            f"games      {len(scores)}",
+            f"score      mean {statistics.fmean(scores):.2f}"
+            f"  median {statistics.median(scores):g}"
+            f"  stdev {statistics.pstdev(scores):.2f}",
+            f"           min {min(scores)}  p10 {deciles[0]:g}"
+            f"  p90 {deciles[-1]:g}  max {max(scores)}",
+            f"survival   mean {statistics.fmean(survival):.1f} s"
+            f"  median {statistics.median(survival):.1f} s",
+            f"end        alive {self.ends[0]}  wall {self.ends[1]}"
+            f"  body {self.ends[2]}",
+            "foods      "
+            + "  ".join(
+                f"{t.name.lower()} {self.foods[t.value]}" for t in game.FoodType
+            ),
+        ]
+        if self.best:
+            lines.append(f"best       seed {self.best.seed}  score {self.best.score}")
+        return lines
+
+
+def run(
+    policy: str,
+    games: int,
+    steps: int,
+    dt: float = 1 / config.GAME_MAX_FPS,
+    first_seed: int = 0,
+    width: int = config.GAME_WIDTH,
+    height: int = config.GAME_HEIGHT,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> Summary:
+    """Play seeds first_seed .. first_seed + games - 1 in a process pool."""
+    get_policy_factory(policy)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or get_chunk_size(games, workers)
+    summary = Summary(dt)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(
+                play_batch,
+                policy,
+                range(start, min(start + chunk_size, first_seed + games)),
+                steps,
+                dt,
+                width,
+                height,
+            )
+            for start in range(first_seed, first_seed + games, chunk_size)
+        ]
+        for future in as_completed(futures):
+            for result in future.result():
+                summary.add(GameResult(*result))
+            if on_batch:
+                on_batch(len(summary.scores))
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="play many headless pysnake games")
+    parser.add_argument(
+        "policy", help="autopilot, random or a module:function policy factory"
+    )
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument(
+        "--time", type=float, default=300, help="seconds of game time per game"
+    )
+    parser.add_argument(
+        "--fps", type=int, default=config.GAME_MAX_FPS, help="policy steps per second"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes (default: all CPUs)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=None, help="games per task")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def on_batch(done: int) -> None:
+        print(f"\r{done}/{args.games} games", end="", flush=True)
+
+    summary = run(
+        args.policy,
+        args.games,
+        round(args.time * args.fps),
+        1 / args.fps,
+        args.seed,
+        workers=args.jobs,
+        chunk_size=args.chunk_size,
+        on_batch=on_batch,
+    )
+    elapsed = time.perf_counter() - start
+    print()
+    for line in summary.get_report_lines():
+        print(line)
+    print(f"wall time  {elapsed:.1f} s  ({args.games / elapsed:.1f} games/s)")
+
+
+if __name__ == "__main__":
+    main()